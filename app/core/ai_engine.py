@@ -5,37 +5,270 @@ This module handles AI-powered code analysis using various LLM providers
 including OpenAI GPT-4, Cohere, and Anthropic Claude.
 """
 
-import openai
-import cohere
-import anthropic
-from typing import Dict, List, Optional, Any
-from app.core.config import settings
-import json
+import httpx
+import orjson
+from typing import AsyncIterator, ClassVar, Dict, List, Optional, Any, Tuple
+from app.core.config import settings, get_api_keys, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_TEMPERATURE
+from app.core.llm_cache import LLMCache, CacheBackend, MemoryBackend, RedisBackend, FileBackend
+from app.core.provider_chain import ProviderChain, ProviderProfile
+import ast
+import asyncio
+import functools
+import io
 import logging
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Limits on provider response size, in characters
+MAX_RESPONSE_CHARS = 1 << 20
+MAX_CHUNK_CHARS = 16 << 10
+
+# Set on results that stand in for a failed AI analysis; callers should not cache them
+DEGRADED_KEY = "degraded"
+
+# Ends a streamed response that failed after output started; a JSON error object follows
+STREAM_ERROR_MARKER = "\n[[STREAM_ERROR]]"
+
+# Tokens that affect JSON nesting; escape sequences are consumed whole
+_JSON_STRUCTURE_RE = re.compile(r'\\.|["{}]', re.DOTALL)
+
+# Keywords that mark performance and security findings in free-text responses
+_PERF_KW = frozenset({'performance', 'slow', 'inefficient', 'complexity', 'recursive'})
+_SEC_KW = frozenset({'input', 'validation', 'security', 'vulnerability'})
+
+# Compiled alternations so each line is matched against a keyword set in one C-level scan
+_PERF_KW_RE = re.compile('|'.join(map(re.escape, sorted(_PERF_KW))))
+_SEC_KW_RE = re.compile('|'.join(map(re.escape, sorted(_SEC_KW))))
+
+def _extract_json_object(content: str) -> Optional[str]:
+    """Return the first balanced {...} block in content, ignoring braces inside strings."""
+    start = None
+    depth = 0
+    in_string = False
+    
+    for match in _JSON_STRUCTURE_RE.finditer(content):
+        token = match.group()
+        if token == '"':
+            if start is not None:
+                in_string = not in_string
+        elif in_string or len(token) == 2:
+            continue
+        elif token == '{':
+            if start is None:
+                start = match.start()
+            depth += 1
+        elif start is not None:
+            depth -= 1
+            if depth == 0:
+                return content[start:match.end()]
+    
+    return None
+
+# Provider SDKs are imported on first use so unconfigured providers cost no memory
+@functools.lru_cache(maxsize=1)
+def _openai_sdk():
+    import openai
+    return openai
+
+@functools.lru_cache(maxsize=1)
+def _cohere_sdk():
+    import cohere
+    return cohere
+
+@functools.lru_cache(maxsize=1)
+def _anthropic_sdk():
+    import anthropic
+    return anthropic
+
+def _detect_fallback_patterns(code: str) -> Dict[str, bool]:
+    """Detect the Python patterns covered by the fallback suggestions."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        # Not parseable; fall back to substring checks
+        code_low = code.lower()
+        return {
+            'recursive_fib': 'fibonacci' in code_low and 'def' in code and 'return' in code
+                             and code.count('calculate_fibonacci') > 1,
+            'unvalidated_input': 'input(' in code and 'int(' in code
+        }
+    
+    recursive_fib = False
+    called = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            called.add(node.func.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not recursive_fib:
+            if 'fibonacci' in node.name.lower():
+                recursive_fib = any(
+                    isinstance(inner, ast.Call) and isinstance(inner.func, ast.Name) and inner.func.id == node.name
+                    for inner in ast.walk(node)
+                )
+    
+    return {
+        'recursive_fib': recursive_fib,
+        'unvalidated_input': 'input' in called and 'int' in called
+    }
+
 class AIEngine:
     """AI engine for code analysis and suggestions."""
     
+    # Static instructions shared by every analysis prompt. Keeping them as an
+    # unchanging prefix lets providers reuse their prompt (KV) cache across requests.
+    _PROMPT_PREFIX: ClassVar[str] = """You are an expert code reviewer. Analyze the code at the end of this message and provide detailed, actionable feedback.
+
+Please analyze this code and provide specific, actionable suggestions for improvement. Focus on:
+
+1. **Performance Issues**: Identify inefficient algorithms, unnecessary computations, or memory usage problems
+2. **Security Vulnerabilities**: Look for input validation issues, potential injection attacks, or unsafe operations
+3. **Code Quality**: Check for best practices, readability, maintainability, and adherence to language conventions
+4. **Logic Errors**: Find potential bugs, edge cases, or logical flaws
+5. **Refactoring Opportunities**: Suggest better patterns, cleaner code structure, or more efficient approaches
+
+For the Fibonacci function specifically, consider:
+- Recursive vs iterative approaches
+- Performance implications of deep recursion
+- Input validation and error handling
+- Memory usage and stack overflow risks
+- Code readability and documentation
+
+Provide your analysis in this exact JSON format:
+{
+    "score": 8,
+    "issues": [
+        {
+            "type": "performance_issue",
+            "severity": "high",
+            "line": 3,
+            "message": "Recursive Fibonacci has exponential time complexity O(2^n)",
+            "suggestion": "Use iterative approach or memoization for better performance"
+        }
+    ],
+    "suggestions": [
+        {
+            "type": "performance_optimization",
+            "description": "Replace recursive implementation with iterative approach",
+            "code": "def calculate_fibonacci(n):\\n    if n <= 1:\\n        return n\\n    a, b = 0, 1\\n    for _ in range(2, n + 1):\\n        a, b = b, a + b\\n    return b",
+            "reason": "Iterative approach has O(n) time complexity vs O(2^n) for recursive"
+        }
+    ],
+    "security_concerns": [
+        {
+            "type": "input_validation",
+            "severity": "medium",
+            "description": "No validation for negative numbers or large inputs",
+            "mitigation": "Add input validation and limits"
+        }
+    ],
+    "performance_notes": [
+        {
+            "area": "algorithm_efficiency",
+            "issue": "Exponential time complexity",
+            "suggestion": "Use iterative or memoized approach"
+        }
+    ],
+    "readability_score": 7,
+    "maintainability_score": 6,
+    "summary": "Code is functionally correct but has significant performance issues. The recursive Fibonacci implementation will be very slow for larger inputs due to exponential time complexity. Consider using an iterative approach or memoization for better performance."
+}
+
+IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the JSON.
+"""
+    
     def __init__(self):
         """Initialize AI engine with available providers."""
         self.openai_client = None
         self.cohere_client = None
         self.anthropic_client = None
+        self.last_prewarm_ts: Optional[float] = None
         
-        # Initialize clients based on available API keys
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
-            self.openai_client = openai
+        # Items submitted to the OpenAI Batch API, by batch ID
+        self._offline_batches: Dict[str, List[Tuple[str, str, Optional[str]]]] = {}
         
-        if settings.COHERE_API_KEY:
-            self.cohere_client = cohere.Client(settings.COHERE_API_KEY)
+        # Shared connection pool so provider calls reuse keep-alive TCP/TLS connections
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE
+            ),
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS)
+        )
+        
+        # Initialize one client per configured API key, in failover order
+        profiles = [
+            ProviderProfile("openai", _openai_sdk().AsyncOpenAI(api_key=key, http_client=self._http))
+            for key in get_api_keys(settings.OPENAI_API_KEY, settings.OPENAI_API_KEYS)
+        ] + [
+            ProviderProfile("cohere", _cohere_sdk().AsyncClient(key))
+            for key in get_api_keys(settings.COHERE_API_KEY, settings.COHERE_API_KEYS)
+        ] + [
+            ProviderProfile("anthropic", _anthropic_sdk().AsyncAnthropic(api_key=key, http_client=self._http))
+            for key in get_api_keys(settings.ANTHROPIC_API_KEY, settings.ANTHROPIC_API_KEYS)
+        ]
+        self.provider_chain = ProviderChain(profiles, max_cooldown=settings.LLM_COOLDOWN_MAX_SECONDS)
+        
+        self.openai_client = self.provider_chain.first_client("openai")
+        self.cohere_client = self.provider_chain.first_client("cohere")
+        self.anthropic_client = self.provider_chain.first_client("anthropic")
+        
+        # Cache provider responses; the prompt is deterministic so replays are safe
+        self.cache = LLMCache(
+            self._create_cache_backend(),
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.LLM_CACHE_SIMILARITY_THRESHOLD
+        )
+    
+    async def prewarm(self) -> None:
+        """
+        Open keep-alive connections to configured providers ahead of traffic.
+        
+        Issues cheap HEAD requests through the shared pool so the first review
+        does not pay for the TCP and TLS handshakes. Failures are ignored.
+        """
+        urls = [
+            str(client.base_url)
+            for client in (self.openai_client, self.anthropic_client)
+            if client is not None
+        ]
+        if not urls:
+            return
         
-        if settings.ANTHROPIC_API_KEY:
-            self.anthropic_client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        requests = [
+            self._http.head(url)
+            for url in urls
+            for _ in range(settings.HTTP_PREWARM_CONNECTIONS)
+        ]
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        
+        failures = sum(1 for result in results if isinstance(result, Exception))
+        if failures:
+            logger.warning("Connection prewarm: %s of %s requests failed", failures, len(results))
+        
+        if failures < len(results):
+            self.last_prewarm_ts = time.time()
+    
+    async def aclose(self) -> None:
+        """Close provider clients and the shared HTTP connection pool."""
+        for profile in self.provider_chain.profiles:
+            if profile.provider == "cohere":
+                await profile.client.close()
+        await self._http.aclose()
     
-    def analyze_code(self, code: str, language: str, context: Optional[str] = None) -> Dict[str, Any]:
+    def _create_cache_backend(self) -> CacheBackend:
+        """Create the configured cache backend, falling back to memory."""
+        try:
+            if settings.LLM_CACHE_BACKEND == "redis":
+                return RedisBackend(settings.LLM_CACHE_REDIS_URL)
+            if settings.LLM_CACHE_BACKEND == "file":
+                return FileBackend(settings.LLM_CACHE_DIR)
+        except Exception as e:
+            logger.warning("Failed to initialize %s cache backend: %s", settings.LLM_CACHE_BACKEND, e)
+        
+        return MemoryBackend(maxsize=settings.LLM_CACHE_MAXSIZE)
+    
+    async def analyze_code(self, code: str, language: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze code using AI and return comprehensive insights.
         
@@ -47,75 +280,441 @@ class AIEngine:
         Returns:
             Dictionary containing AI analysis results
         """
+        if self._exceeds_input_limits(code):
+            return self._get_oversized_fallback(code, language)
+        
+        # Build the prompt once; it is shared by the cache key and every provider attempt
+        prompt = self._build_analysis_prompt(code, language, context)
+        cache_key, cache_namespace = self._cache_key(prompt, language, context)
+        
+        cached, embedding = await self._cache_lookup(code, cache_key, cache_namespace)
+        if cached is not None:
+            return cached
+        
         try:
-            # Try OpenAI first, then fallback to other providers
-            if self.openai_client:
-                return self._analyze_with_openai(code, language, context)
-            elif self.cohere_client:
-                return self._analyze_with_cohere(code, language, context)
-            elif self.anthropic_client:
-                return self._analyze_with_anthropic(code, language, context)
-            else:
-                raise ValueError("No AI provider configured")
+            # Try each available key in order, skipping keys in cooldown
+            for profile in self.provider_chain.available():
+                try:
+                    result = await asyncio.wait_for(
+                        self._analyze_with_profile(profile, prompt),
+                        timeout=settings.LLM_PROVIDER_TIMEOUT_SECONDS
+                    )
+                except Exception as e:
+                    logger.warning("%s analysis failed, trying next provider: %s", profile.provider, str(e) or type(e).__name__)
+                    self.provider_chain.mark_failure(profile, e)
+                    continue
+                
+                self.provider_chain.mark_success(profile)
+                await self.cache.set(cache_key, result, embedding=embedding, namespace=cache_namespace)
+                return result
+            
+            raise ValueError("No AI provider available")
                 
         except Exception as e:
-            logger.error(f"AI analysis failed: {str(e)}")
+            logger.error("AI analysis failed: %s", e)
             # Use fallback suggestions when AI fails
-            return self._get_fallback_suggestions(code, language)
+            return self._get_degraded_fallback(code, language)
     
-    def _analyze_with_openai(self, code: str, language: str, context: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze code using OpenAI GPT-4."""
+    async def analyze_code_stream(self, code: str, language: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Analyze code and stream the provider's JSON response as it is generated.
+        
+        Cached results, Cohere results and fallback suggestions are emitted as a
+        single JSON chunk. Streamed responses are parsed and cached once complete.
+        If a provider fails or its response is truncated after output has
+        started, the stream ends with STREAM_ERROR_MARKER and a JSON error object.
+        
+        Args:
+            code: The code to analyze
+            language: Programming language of the code
+            context: Optional context about the code
+            
+        Yields:
+            Chunks of the JSON analysis document
+        """
+        if self._exceeds_input_limits(code):
+            yield orjson.dumps(self._get_oversized_fallback(code, language)).decode()
+            return
+        
         prompt = self._build_analysis_prompt(code, language, context)
+        cache_key, cache_namespace = self._cache_key(prompt, language, context)
         
-        response = self.openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an expert code reviewer. Analyze the provided code and return a JSON response with detailed insights."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=settings.OPENAI_MAX_TOKENS,
-            temperature=settings.OPENAI_TEMPERATURE
+        cached, embedding = await self._cache_lookup(code, cache_key, cache_namespace)
+        if cached is not None:
+            yield orjson.dumps(cached).decode()
+            return
+        
+        for profile in self.provider_chain.available():
+            if profile.provider == "cohere":
+                stream = self._stream_cohere(profile.client, prompt)
+            elif profile.provider == "openai":
+                stream = self._stream_openai(profile.client, prompt)
+            else:
+                stream = self._stream_anthropic(profile.client, prompt)
+            stream = self._deadline_stream(self._bounded_stream(stream), settings.LLM_PROVIDER_TIMEOUT_SECONDS)
+            
+            chunks: List[str] = []
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                logger.warning("%s streaming analysis failed: %s", profile.provider, str(e) or type(e).__name__)
+                self.provider_chain.mark_failure(profile, e)
+                if chunks:
+                    # Part of the response was already sent; it cannot be retried
+                    yield self._stream_error("AI provider failed before completing the response")
+                    return
+                continue
+            
+            content = "".join(chunks)
+            if len(content) >= MAX_RESPONSE_CHARS:
+                # Cut off by _bounded_stream; the client holds incomplete JSON
+                yield self._stream_error("AI response exceeded the size limit and was truncated")
+                return
+            
+            self.provider_chain.mark_success(profile)
+            await self.cache.set(cache_key, self._parse_content(content), embedding=embedding, namespace=cache_namespace)
+            return
+        
+        logger.error("AI analysis failed: No AI provider available")
+        yield orjson.dumps(self._get_degraded_fallback(code, language)).decode()
+    
+    async def analyze_code_many(self, items: List[Tuple[str, str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several code snippets concurrently.
+        
+        Args:
+            items: List of (code, language, context) tuples
+            
+        Returns:
+            List of AI analysis results, in the same order as items
+        """
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        
+        async def analyze(code: str, language: str, context: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_code(code, language, context)
+        
+        results = await asyncio.gather(*(analyze(*item) for item in items), return_exceptions=True)
+        
+        return [
+            self._get_degraded_fallback(code, language) if isinstance(result, Exception) else result
+            for (code, language, _), result in zip(items, results)
+        ]
+    
+    async def submit_batch(self, items: List[Tuple[str, str, Optional[str]]]) -> str:
+        """
+        Submit analyses to the OpenAI Batch API for discounted offline processing.
+        
+        Items over the AI input limits are not submitted; they receive
+        fallback suggestions when the results are fetched.
+        
+        Args:
+            items: List of (code, language, context) tuples
+            
+        Returns:
+            OpenAI batch ID
+        """
+        if not self.openai_client:
+            raise ValueError("Offline batch analysis requires an OpenAI API key")
+        
+        lines = [
+            orjson.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": OPENAI_MODEL,
+                    "messages": self._openai_messages(self._build_analysis_prompt(code, language, context)),
+                    "max_tokens": OPENAI_MAX_TOKENS,
+                    "temperature": OPENAI_TEMPERATURE,
+                    "prompt_cache_key": settings.OPENAI_PROMPT_CACHE_KEY
+                }
+            })
+            for index, (code, language, context) in enumerate(items)
+            if not self._exceeds_input_limits(code)
+        ]
+        if not lines:
+            raise ValueError("No files within the AI input limits to submit")
+        
+        input_file = await self.openai_client.files.create(
+            file=("batch_input.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await self.openai_client.post(
+            "/batches",
+            body={
+                "input_file_id": input_file.id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            },
+            cast_to=Dict[str, Any]
         )
         
-        content = response.choices[0].message.content
+        self._offline_batches[batch["id"]] = items
+        logger.info("Submitted offline batch %s with %s requests", batch["id"], len(lines))
+        return batch["id"]
+    
+    async def poll_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get the status of an offline batch.
+        
+        Args:
+            batch_id: OpenAI batch ID
+            
+        Returns:
+            Batch object, including its status and output file ID
+        """
+        if not self.openai_client:
+            raise ValueError("Offline batch analysis requires an OpenAI API key")
+        
+        return await self.openai_client.get(f"/batches/{batch_id}", cast_to=Dict[str, Any])
+    
+    async def fetch_batch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        """
+        Download and parse the results of a completed offline batch.
+        
+        Args:
+            batch_id: OpenAI batch ID returned by submit_batch
+            
+        Returns:
+            List of AI analysis results, in the same order as the submitted items
+        """
+        items = self._offline_batches.get(batch_id)
+        if items is None:
+            raise ValueError(f"Unknown offline batch: {batch_id}")
+        
+        batch = await self.poll_batch(batch_id)
+        if batch.get("status") != "completed":
+            raise ValueError(f"Offline batch {batch_id} is not complete (status: {batch.get('status')})")
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        if batch.get("output_file_id"):
+            output = await self.openai_client.files.retrieve_content(batch["output_file_id"])
+            for line in io.StringIO(output):
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                    response = entry.get("response") or {}
+                    if response.get("status_code") == 200:
+                        content = response["body"]["choices"][0]["message"]["content"]
+                        results[entry["custom_id"]] = self._parse_content(content[:MAX_RESPONSE_CHARS])
+                except (orjson.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+                    logger.warning("Skipping malformed result in offline batch %s: %s", batch_id, e)
+        
+        # The batch is finished; its items are no longer needed
+        self._offline_batches.pop(batch_id, None)
+        
+        analyses = []
+        for index, (code, language, context) in enumerate(items):
+            result = results.get(str(index))
+            if result is None:
+                result = self._get_degraded_fallback(code, language)
+            else:
+                prompt = self._build_analysis_prompt(code, language, context)
+                cache_key, cache_namespace = self._cache_key(prompt, language, context)
+                await self.cache.set(cache_key, result, namespace=cache_namespace)
+            analyses.append(result)
+        
+        return analyses
+    
+    def discard_batch(self, batch_id: str) -> None:
+        """Forget the items of an offline batch that will not be fetched."""
+        self._offline_batches.pop(batch_id, None)
+    
+    def _exceeds_input_limits(self, code: str) -> bool:
+        """Check whether code is too large to send to an AI provider."""
+        return (
+            len(code.encode("utf-8")) > settings.MAX_CODE_BYTES
+            or len(code.splitlines()) > settings.MAX_CODE_LINES
+        )
+    
+    def _get_oversized_fallback(self, code: str, language: str) -> Dict[str, Any]:
+        """Return static fallback suggestions for code over the input limits."""
+        logger.info("Skipping AI analysis for oversized %s input (%s chars)", language, len(code))
+        result = self._get_fallback_suggestions(code, language)
+        result["summary"] = "File too large; analyzed statically. " + result["summary"]
+        return result
+    
+    def _get_degraded_fallback(self, code: str, language: str) -> Dict[str, Any]:
+        """Return fallback suggestions marked as standing in for a failed AI analysis."""
+        result = self._get_fallback_suggestions(code, language)
+        result[DEGRADED_KEY] = True
+        return result
+    
+    def _cache_key(self, prompt: str, language: str, context: Optional[str]) -> Tuple[str, str]:
+        """Return the exact cache key and semantic namespace for a request."""
+        cache_key = LLMCache.make_key(
+            model=OPENAI_MODEL,
+            prompt=prompt,
+            temperature=OPENAI_TEMPERATURE
+        )
+        return cache_key, f"{OPENAI_MODEL}:{language}:{context or ''}"
+    
+    async def _cache_lookup(
+        self, code: str, cache_key: str, cache_namespace: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up a cached response, embedding the code only after an exact miss.
+        
+        Returns:
+            Cached response (or None) and the code embedding, if one was computed
+        """
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached, None
+        
+        embedding = await self._embed_code(code)
+        return await self.cache.get_similar(embedding, cache_namespace), embedding
+    
+    async def _embed_code(self, code: str) -> Optional[List[float]]:
+        """Embed code for the semantic cache tier, if enabled."""
+        if not settings.LLM_CACHE_SEMANTIC_ENABLED or not self.cohere_client:
+            return None
         
         try:
-            # Try to parse JSON response
-            return json.loads(content)
-        except json.JSONDecodeError:
-            # If not JSON, structure the response
-            return self._parse_text_response(content)
+            response = await self.cohere_client.embed(
+                texts=[code],
+                model="embed-english-v3.0",
+                input_type="search_query"
+            )
+            return response.embeddings[0]
+        except Exception as e:
+            logger.warning("Code embedding failed: %s", e)
+            return None
     
-    def _analyze_with_cohere(self, code: str, language: str, context: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze code using Cohere."""
-        prompt = self._build_analysis_prompt(code, language, context)
+    async def _analyze_with_profile(self, profile: ProviderProfile, prompt: str) -> Dict[str, Any]:
+        """Analyze a prompt with the provider client of a chain profile."""
+        if profile.provider == "openai":
+            return await self._analyze_with_openai(profile.client, prompt)
+        if profile.provider == "cohere":
+            return await self._analyze_with_cohere(profile.client, prompt)
+        return await self._analyze_with_anthropic(profile.client, prompt)
+    
+    async def _analyze_with_openai(self, client: Any, prompt: str) -> Dict[str, Any]:
+        """Analyze code using OpenAI GPT-4."""
+        content = "".join([chunk async for chunk in self._bounded_stream(self._stream_openai(client, prompt))])
+        return self._parse_content(content)
+    
+    def _openai_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build the OpenAI chat messages for an analysis prompt."""
+        return [
+            {"role": "system", "content": "You are an expert code reviewer. Analyze the provided code and return a JSON response with detailed insights."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def _stream_openai(self, client: Any, prompt: str) -> AsyncIterator[str]:
+        """Stream completion text from OpenAI."""
+        stream = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=self._openai_messages(prompt),
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE,
+            stream=True,
+            # Route requests sharing the static prompt prefix to the same prompt cache
+            extra_body={"prompt_cache_key": settings.OPENAI_PROMPT_CACHE_KEY}
+        )
         
-        response = self.cohere_client.generate(
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _analyze_with_cohere(self, client: Any, prompt: str) -> Dict[str, Any]:
+        """Analyze code using Cohere."""
+        response = await client.generate(
             model='command',
             prompt=prompt,
-            max_tokens=settings.OPENAI_MAX_TOKENS,
-            temperature=settings.OPENAI_TEMPERATURE
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE
         )
         
         content = response.generations[0].text
         return self._parse_text_response(content)
     
-    def _analyze_with_anthropic(self, code: str, language: str, context: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze code using Anthropic Claude."""
-        prompt = self._build_analysis_prompt(code, language, context)
-        
-        response = self.anthropic_client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=settings.OPENAI_MAX_TOKENS,
-            messages=[{"role": "user", "content": prompt}]
+    async def _stream_cohere(self, client: Any, prompt: str) -> AsyncIterator[str]:
+        """Yield Cohere completion text as a single chunk; generation is not streamed."""
+        response = await client.generate(
+            model='command',
+            prompt=prompt,
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE
         )
-        
-        content = response.content[0].text
+        content = response.generations[0].text[:MAX_RESPONSE_CHARS]
+        for start in range(0, len(content), MAX_CHUNK_CHARS):
+            yield content[start:start + MAX_CHUNK_CHARS]
+    
+    async def _analyze_with_anthropic(self, client: Any, prompt: str) -> Dict[str, Any]:
+        """Analyze code using Anthropic Claude."""
+        content = "".join([chunk async for chunk in self._bounded_stream(self._stream_anthropic(client, prompt))])
         return self._parse_text_response(content)
     
+    async def _stream_anthropic(self, client: Any, prompt: str) -> AsyncIterator[str]:
+        """Stream completion text from Anthropic, caching the static prompt prefix."""
+        # Send the shared prefix as a cacheable system block and only the tail as the message
+        prompt_tail = prompt[len(self._PROMPT_PREFIX):]
+        async with client.messages.stream(
+            model="claude-3-sonnet-20240229",
+            max_tokens=OPENAI_MAX_TOKENS,
+            system=[{"type": "text", "text": self._PROMPT_PREFIX, "cache_control": {"type": "ephemeral"}}],
+            messages=[{"role": "user", "content": prompt_tail}]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
+    async def _bounded_stream(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Cap the size of each chunk and of the whole response from a provider stream."""
+        received = 0
+        try:
+            async for chunk in stream:
+                chunk = chunk[:MAX_CHUNK_CHARS]
+                if received + len(chunk) >= MAX_RESPONSE_CHARS:
+                    yield chunk[:MAX_RESPONSE_CHARS - received]
+                    logger.warning("Provider response truncated at %s characters", MAX_RESPONSE_CHARS)
+                    break
+                received += len(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def _deadline_stream(self, stream: AsyncIterator[str], timeout_seconds: float) -> AsyncIterator[str]:
+        """Fail a provider stream once the time spent waiting on it exceeds timeout_seconds."""
+        remaining = timeout_seconds
+        try:
+            while True:
+                started = time.monotonic()
+                # The timeout only covers the wait for the provider, not the consumer
+                async with asyncio.timeout(remaining):
+                    try:
+                        chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        return
+                remaining -= time.monotonic() - started
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    @staticmethod
+    def _stream_error(message: str) -> str:
+        """Build the terminal error marker for a failed streamed response."""
+        return STREAM_ERROR_MARKER + orjson.dumps({"error": message}).decode()
+    
+    def _parse_content(self, content: str) -> Dict[str, Any]:
+        """Parse a provider response, structuring it from text if it is not JSON."""
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return self._parse_text_response(content)
+    
     def _build_analysis_prompt(self, code: str, language: str, context: Optional[str] = None) -> str:
         """Build the analysis prompt for AI providers."""
-        prompt = f"""You are an expert code reviewer. Analyze this {language} code and provide detailed, actionable feedback.
+        return self._PROMPT_PREFIX + self._build_prompt_tail(code, language, context)
+    
+    def _build_prompt_tail(self, code: str, language: str, context: Optional[str] = None) -> str:
+        """Build the request-specific part of the analysis prompt."""
+        return f"""
+Analyze this {language} code.
 
 Code to review:
 ```{language}
@@ -123,95 +722,38 @@ Code to review:
 ```
 
 Context: {context or "General code review"}
-
-Please analyze this code and provide specific, actionable suggestions for improvement. Focus on:
-
-1. **Performance Issues**: Identify inefficient algorithms, unnecessary computations, or memory usage problems
-2. **Security Vulnerabilities**: Look for input validation issues, potential injection attacks, or unsafe operations
-3. **Code Quality**: Check for best practices, readability, maintainability, and adherence to language conventions
-4. **Logic Errors**: Find potential bugs, edge cases, or logical flaws
-5. **Refactoring Opportunities**: Suggest better patterns, cleaner code structure, or more efficient approaches
-
-For the Fibonacci function specifically, consider:
-- Recursive vs iterative approaches
-- Performance implications of deep recursion
-- Input validation and error handling
-- Memory usage and stack overflow risks
-- Code readability and documentation
-
-Provide your analysis in this exact JSON format:
-{{
-    "score": 8,
-    "issues": [
-        {{
-            "type": "performance_issue",
-            "severity": "high",
-            "line": 3,
-            "message": "Recursive Fibonacci has exponential time complexity O(2^n)",
-            "suggestion": "Use iterative approach or memoization for better performance"
-        }}
-    ],
-    "suggestions": [
-        {{
-            "type": "performance_optimization",
-            "description": "Replace recursive implementation with iterative approach",
-            "code": "def calculate_fibonacci(n):\\n    if n <= 1:\\n        return n\\n    a, b = 0, 1\\n    for _ in range(2, n + 1):\\n        a, b = b, a + b\\n    return b",
-            "reason": "Iterative approach has O(n) time complexity vs O(2^n) for recursive"
-        }}
-    ],
-    "security_concerns": [
-        {{
-            "type": "input_validation",
-            "severity": "medium",
-            "description": "No validation for negative numbers or large inputs",
-            "mitigation": "Add input validation and limits"
-        }}
-    ],
-    "performance_notes": [
-        {{
-            "area": "algorithm_efficiency",
-            "issue": "Exponential time complexity",
-            "suggestion": "Use iterative or memoized approach"
-        }}
-    ],
-    "readability_score": 7,
-    "maintainability_score": 6,
-    "summary": "Code is functionally correct but has significant performance issues. The recursive Fibonacci implementation will be very slow for larger inputs due to exponential time complexity. Consider using an iterative approach or memoization for better performance."
-}}
-
-IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the JSON."""
-        return prompt
+"""
     
     def _parse_text_response(self, content: str) -> Dict[str, Any]:
         """Parse text response when JSON parsing fails."""
-        # Try to extract JSON from the response
-        import re
+        content = content[:MAX_RESPONSE_CHARS]
         
         # Look for JSON-like content in the response
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
+        json_str = _extract_json_object(content)
+        if json_str:
             try:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-            except json.JSONDecodeError:
+                return orjson.loads(json_str)
+            except orjson.JSONDecodeError:
                 pass
         
         # If no valid JSON found, create a structured response from text
-        lines = content.split('\n')
+        lines = io.StringIO(content)
         issues = []
         suggestions = []
         security_concerns = []
         performance_notes = []
+        content_lower = content.lower()
+        mentions_fibonacci = 'fibonacci' in content_lower
         
         # Extract issues and suggestions from text
         for line in lines:
-            line = line.strip()
-            if not line:
+            low = line.strip().lower()
+            if not low:
                 continue
                 
             # Look for performance issues
-            if any(keyword in line.lower() for keyword in ['performance', 'slow', 'inefficient', 'complexity', 'recursive']):
-                if 'fibonacci' in content.lower() and 'recursive' in line.lower():
+            if _PERF_KW_RE.search(low):
+                if mentions_fibonacci and 'recursive' in low:
                     issues.append({
                         "type": "performance_issue",
                         "severity": "high",
@@ -232,7 +774,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
                     })
             
             # Look for security issues
-            if any(keyword in line.lower() for keyword in ['input', 'validation', 'security', 'vulnerability']):
+            if _SEC_KW_RE.search(low):
                 security_concerns.append({
                     "type": "input_validation",
                     "severity": "medium",
@@ -242,7 +784,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
         
         # Calculate scores based on content analysis
         score = 5  # Default
-        if 'performance' in content.lower() and 'recursive' in content.lower():
+        if 'performance' in content_lower and 'recursive' in content_lower:
             score = 3  # Lower score for performance issues
         
         return {
@@ -265,39 +807,40 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
         performance_notes = []
         
         if language.lower() == 'python':
+            detected = _detect_fallback_patterns(code)
+            
             # Check for recursive Fibonacci pattern
-            if 'fibonacci' in code.lower() and 'def' in code and 'return' in code:
-                if code.count('calculate_fibonacci') > 1:  # Recursive calls
-                    issues.append({
-                        "type": "performance_issue",
-                        "severity": "high",
-                        "line": 3,
-                        "message": "Recursive Fibonacci has exponential time complexity O(2^n)",
-                        "suggestion": "Use iterative approach or memoization for better performance"
-                    })
-                    
-                    suggestions.append({
-                        "type": "performance_optimization",
-                        "description": "Replace recursive implementation with iterative approach",
-                        "code": "def calculate_fibonacci(n):\n    if n <= 1:\n        return n\n    a, b = 0, 1\n    for _ in range(2, n + 1):\n        a, b = b, a + b\n    return b",
-                        "reason": "Iterative approach has O(n) time complexity vs O(2^n) for recursive"
-                    })
-                    
-                    suggestions.append({
-                        "type": "memoization",
-                        "description": "Add memoization to recursive function",
-                        "code": "from functools import lru_cache\n\n@lru_cache(maxsize=None)\ndef calculate_fibonacci(n):\n    if n <= 1:\n        return n\n    return calculate_fibonacci(n-1) + calculate_fibonacci(n-2)",
-                        "reason": "Memoization reduces time complexity to O(n) while keeping recursive structure"
-                    })
-                    
-                    performance_notes.append({
-                        "area": "algorithm_efficiency",
-                        "issue": "Exponential time complexity",
-                        "suggestion": "Use iterative or memoized approach"
-                    })
+            if detected['recursive_fib']:
+                issues.append({
+                    "type": "performance_issue",
+                    "severity": "high",
+                    "line": 3,
+                    "message": "Recursive Fibonacci has exponential time complexity O(2^n)",
+                    "suggestion": "Use iterative approach or memoization for better performance"
+                })
+                
+                suggestions.append({
+                    "type": "performance_optimization",
+                    "description": "Replace recursive implementation with iterative approach",
+                    "code": "def calculate_fibonacci(n):\n    if n <= 1:\n        return n\n    a, b = 0, 1\n    for _ in range(2, n + 1):\n        a, b = b, a + b\n    return b",
+                    "reason": "Iterative approach has O(n) time complexity vs O(2^n) for recursive"
+                })
+                
+                suggestions.append({
+                    "type": "memoization",
+                    "description": "Add memoization to recursive function",
+                    "code": "from functools import lru_cache\n\n@lru_cache(maxsize=None)\ndef calculate_fibonacci(n):\n    if n <= 1:\n        return n\n    return calculate_fibonacci(n-1) + calculate_fibonacci(n-2)",
+                    "reason": "Memoization reduces time complexity to O(n) while keeping recursive structure"
+                })
+                
+                performance_notes.append({
+                    "area": "algorithm_efficiency",
+                    "issue": "Exponential time complexity",
+                    "suggestion": "Use iterative or memoized approach"
+                })
             
             # Check for input validation issues
-            if 'input(' in code and 'int(' in code:
+            if detected['unvalidated_input']:
                 security_concerns.append({
                     "type": "input_validation",
                     "severity": "medium",
@@ -324,7 +867,7 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
             "raw_response": "Fallback analysis"
         }
     
-    def generate_refactored_code(self, code: str, language: str, improvement_type: str) -> str:
+    async def generate_refactored_code(self, code: str, language: str, improvement_type: str) -> str:
         """
         Generate refactored code based on improvement type.
         
@@ -349,13 +892,13 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
         
         try:
             if self.openai_client:
-                response = self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
+                response = await self.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
                     messages=[
                         {"role": "system", "content": "You are an expert code refactoring assistant. Provide clean, improved code."},
                         {"role": "user", "content": prompt}
                     ],
-                    max_tokens=settings.OPENAI_MAX_TOKENS,
+                    max_tokens=OPENAI_MAX_TOKENS,
                     temperature=0.1
                 )
                 return response.choices[0].message.content.strip()
@@ -363,9 +906,6 @@ IMPORTANT: Return ONLY valid JSON. Do not include any text before or after the J
                 return code  # Return original if no AI provider available
                 
         except Exception as e:
-            logger.error(f"Code refactoring failed: {str(e)}")
+            logger.error("Code refactoring failed: %s", e)
             return code
 
-# Global AI engine instance
-ai_engine = AIEngine()
-
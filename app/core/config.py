@@ -25,15 +25,49 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4"
     OPENAI_MAX_TOKENS: int = 4000
     OPENAI_TEMPERATURE: float = 0.1
+    OPENAI_PROMPT_CACHE_KEY: str = "ai-code-reviewer-v1"
+    MAX_CODE_BYTES: int = 16384  # Larger inputs are analyzed statically only
+    MAX_CODE_LINES: int = 400
     
     # Alternative AI Models
     COHERE_API_KEY: Optional[str] = None
     ANTHROPIC_API_KEY: Optional[str] = None
     
+    # Additional comma-separated API keys, rotated when a key is rate limited
+    OPENAI_API_KEYS: Optional[str] = None
+    COHERE_API_KEYS: Optional[str] = None
+    ANTHROPIC_API_KEYS: Optional[str] = None
+    
+    # Provider Failover Configuration
+    LLM_PROVIDER_TIMEOUT_SECONDS: float = 60.0
+    LLM_COOLDOWN_MAX_SECONDS: float = 60.0
+    
+    # HTTP Connection Pool Configuration (shared by AI provider clients)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 50
+    HTTP_TIMEOUT_SECONDS: float = 120.0
+    HTTP_PREWARM_CONNECTIONS: int = 4  # Connections opened per provider at startup
+    LLM_MAX_CONCURRENCY: int = 32  # Concurrent provider calls per batch
+    MAX_CONCURRENT_REVIEWS: int = 8  # Concurrent file reviews per batch
+    REVIEW_CACHE_MAXSIZE: int = 1024  # Completed reviews cached by content hash
+    OFFLINE_BATCH_TTL_SECONDS: int = 172800  # Pending offline batches are dropped after this
+    OFFLINE_BATCH_MAX_COMPLETED: int = 100  # Finished offline batches kept for polling
+    
+    # LLM Response Cache Configuration
+    LLM_CACHE_BACKEND: str = "memory"  # memory, redis, or file
+    LLM_CACHE_MAXSIZE: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    LLM_CACHE_DIR: str = "./.llm_cache"
+    LLM_CACHE_SEMANTIC_ENABLED: bool = False
+    LLM_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    
     # Static Analysis Tools Configuration
     PYLINT_ENABLED: bool = True
     ESLINT_ENABLED: bool = True
     BANDIT_ENABLED: bool = True
+    STATIC_ANALYSIS_CACHE_MAXSIZE: int = 512  # Tool results cached by code hash
+    PYLINT_IN_PROCESS: bool = False  # Run pylint in the service process (no timeout, serialized)
     
     # Security Configuration
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -55,14 +89,31 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+        frozen = True
 
 # Global settings instance
 settings = Settings()
 
+# Snapshots of settings read on every AI call
+OPENAI_MODEL = settings.OPENAI_MODEL
+OPENAI_MAX_TOKENS = settings.OPENAI_MAX_TOKENS
+OPENAI_TEMPERATURE = settings.OPENAI_TEMPERATURE
+
+def get_api_keys(primary_key: Optional[str], extra_keys: Optional[str]) -> List[str]:
+    """Merge a primary API key with comma-separated extra keys, preserving order."""
+    keys = [primary_key] if primary_key else []
+    if extra_keys:
+        keys.extend(key.strip() for key in extra_keys.split(','))
+    return list(dict.fromkeys(key for key in keys if key))
+
 # Validate required settings
 def validate_settings():
     """Validate that required settings are configured."""
-    if not settings.OPENAI_API_KEY and not settings.COHERE_API_KEY and not settings.ANTHROPIC_API_KEY:
+    if not (
+        get_api_keys(settings.OPENAI_API_KEY, settings.OPENAI_API_KEYS)
+        or get_api_keys(settings.COHERE_API_KEY, settings.COHERE_API_KEYS)
+        or get_api_keys(settings.ANTHROPIC_API_KEY, settings.ANTHROPIC_API_KEYS)
+    ):
         raise ValueError("At least one AI API key must be configured (OpenAI, Cohere, or Anthropic)")
     
     return True
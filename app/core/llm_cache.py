@@ -0,0 +1,298 @@
+"""
+LLM Response Cache
+
+This module provides a two-tier cache for AI provider responses: an exact
+tier keyed by a hash of the request, and an optional semantic tier that
+matches near-identical code by embedding similarity. The cache is
+best-effort: backend errors are logged and treated as misses.
+"""
+
+import asyncio
+import hashlib
+import math
+import operator
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(Protocol):
+    """Storage interface for cached LLM responses."""
+
+    # Whether get/set perform blocking I/O and must run off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None if missing or expired."""
+        ...
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        """Store value under key, expiring after ttl_seconds if given."""
+        ...
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        ...
+
+class MemoryBackend:
+    """In-process LRU cache backend."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024):
+        """Initialize the backend with a maximum number of entries."""
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        # Evict least recently used entries
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+class RedisBackend:
+    """Redis cache backend, shared across workers."""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "llm_cache:", timeout_seconds: float = 1.0):
+        """Initialize the backend with a Redis connection URL."""
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(
+            url,
+            socket_connect_timeout=timeout_seconds,
+            socket_timeout=timeout_seconds
+        )
+        # Connections are lazy; fail now so callers can fall back to another backend
+        self._client.ping()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return orjson.loads(raw)
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        self._client.set(self.prefix + key, orjson.dumps(value), ex=ttl_seconds or None)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+class FileBackend:
+    """File system cache backend, one JSON file per entry."""
+
+    blocking = True
+
+    def __init__(self, directory: str):
+        """Initialize the backend, creating the cache directory if needed."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "rb") as cache_file:
+                entry = orjson.loads(cache_file.read())
+        except (OSError, ValueError):
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+            return None
+
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        entry = {
+            "expires_at": time.time() + ttl_seconds if ttl_seconds else None,
+            "value": value
+        }
+        with open(self._path(key), "wb") as cache_file:
+            cache_file.write(orjson.dumps(entry))
+
+    def clear(self) -> None:
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".json"):
+                os.unlink(os.path.join(self.directory, file_name))
+
+class LLMCache:
+    """Two-tier cache for LLM analysis results."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: Optional[int] = 3600,
+        similarity_threshold: float = 0.92,
+        max_semantic_entries: int = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend for cached responses
+            ttl_seconds: Time to live for cached responses
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_semantic_entries: Maximum number of embeddings kept in memory
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_semantic_entries = max_semantic_entries
+
+        # Normalized embeddings by cache key, scoped by namespace
+        self._embeddings: "OrderedDict[str, Tuple[str, List[float]]]" = OrderedDict()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(**fields: Any) -> str:
+        """Build a deterministic cache key from request fields."""
+        payload = orjson.dumps(fields, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response by exact key.
+
+        A miss is not counted here; callers follow it with get_similar,
+        which records the semantic hit or the miss.
+
+        Args:
+            key: Exact cache key
+
+        Returns:
+            Cached response or None
+        """
+        value = await self._read_backend(self.backend.get, key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    async def get_similar(self, embedding: Optional[List[float]], namespace: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response for near-identical code after an exact miss.
+
+        Args:
+            embedding: Embedding of the code, or None if the semantic tier is off
+            namespace: Scope for semantic matches (e.g. model and language)
+
+        Returns:
+            Cached response or None
+        """
+        if embedding is not None:
+            similar_key = self._find_similar(embedding, namespace)
+            if similar_key is not None:
+                value = await self._read_backend(self.backend.get, similar_key)
+                if value is not None:
+                    self.semantic_hits += 1
+                    return value
+                # Backend entry expired; drop the stale embedding
+                self._embeddings.pop(similar_key, None)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], embedding: Optional[List[float]] = None, namespace: str = "") -> None:
+        """Store a response, indexing its embedding for the semantic tier."""
+        try:
+            await self._run_backend(self.backend.set, key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning("LLM cache write failed: %s", e)
+            return
+
+        if embedding is not None:
+            normalized = self._normalize(embedding)
+            if normalized is not None:
+                self._embeddings[key] = (namespace, normalized)
+                self._embeddings.move_to_end(key)
+                while len(self._embeddings) > self.max_semantic_entries:
+                    self._embeddings.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses and embeddings."""
+        self.backend.clear()
+        self._embeddings.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss statistics."""
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0
+        }
+
+    async def _run_backend(self, method: Callable[..., Any], *args: Any) -> Any:
+        """Call a backend method, in a worker thread if the backend blocks."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _read_backend(self, method: Callable[..., Any], *args: Any) -> Any:
+        """Call a backend method, logging errors and returning None on failure."""
+        try:
+            return await self._run_backend(method, *args)
+        except Exception as e:
+            logger.warning("LLM cache read failed: %s", e)
+            return None
+
+    def _find_similar(self, embedding: List[float], namespace: str) -> Optional[str]:
+        """Find the cached key whose embedding is most similar to embedding."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        best_key = None
+        best_score = self.similarity_threshold
+        for key, (entry_namespace, vector) in self._embeddings.items():
+            if entry_namespace != namespace:
+                continue
+            score = sum(map(operator.mul, query, vector))
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        return best_key
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[List[float]]:
+        """Scale vector to unit length so cosine similarity is a dot product."""
+        norm = math.sqrt(sum(component * component for component in vector))
+        if not norm:
+            return None
+        return [component / norm for component in vector]
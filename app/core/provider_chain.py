@@ -0,0 +1,95 @@
+"""
+AI Provider Failover Chain
+
+This module tracks the health of each configured AI provider key so that
+rate-limited or failing keys are skipped until their cooldown expires.
+"""
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes that mean the key itself is unusable
+AUTH_FAILURE_STATUS_CODES = (401, 403)
+
+class ProfileState(str, Enum):
+    """Health states for a provider profile."""
+    HEALTHY = "healthy"
+    COOLDOWN = "cooldown"
+    DEAD = "dead"
+
+@dataclass
+class ProviderProfile:
+    """A single provider client bound to one API key."""
+    provider: str
+    client: Any
+    state: ProfileState = ProfileState.HEALTHY
+    cooldown_seconds: float = 0.0
+    next_retry_at: float = 0.0
+    failures: int = 0
+
+class ProviderChain:
+    """Ordered list of provider profiles with exponential-backoff cooldown."""
+
+    def __init__(self, profiles: List[ProviderProfile], base_cooldown: float = 1.0, max_cooldown: float = 60.0):
+        """
+        Initialize the chain.
+
+        Args:
+            profiles: Provider profiles in priority order
+            base_cooldown: Cooldown after the first failure, in seconds
+            max_cooldown: Upper bound for the cooldown, in seconds
+        """
+        self.profiles = profiles
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+
+        for profile in self.profiles:
+            profile.cooldown_seconds = base_cooldown
+
+    def available(self) -> List[ProviderProfile]:
+        """Return profiles that can be tried now, in priority order."""
+        now = time.monotonic()
+        return [
+            profile for profile in self.profiles
+            if profile.state == ProfileState.HEALTHY
+            or (profile.state == ProfileState.COOLDOWN and profile.next_retry_at <= now)
+        ]
+
+    def first_client(self, provider: str) -> Optional[Any]:
+        """Return the client of the first profile for a provider."""
+        for profile in self.profiles:
+            if profile.provider == provider:
+                return profile.client
+        return None
+
+    def mark_success(self, profile: ProviderProfile) -> None:
+        """Reset a profile after a successful call."""
+        profile.state = ProfileState.HEALTHY
+        profile.cooldown_seconds = self.base_cooldown
+        profile.failures = 0
+
+    def mark_failure(self, profile: ProviderProfile, error: Exception) -> None:
+        """Put a profile into cooldown, or retire it on authentication errors."""
+        profile.failures += 1
+
+        status_code = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+        if status_code in AUTH_FAILURE_STATUS_CODES:
+            profile.state = ProfileState.DEAD
+            logger.error("Disabling %s key after authentication failure (%s)", profile.provider, status_code)
+            return
+
+        profile.state = ProfileState.COOLDOWN
+        profile.next_retry_at = time.monotonic() + profile.cooldown_seconds
+        profile.cooldown_seconds = min(profile.cooldown_seconds * 2, self.max_cooldown)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the state of each profile, without credentials."""
+        return [
+            {"provider": profile.provider, "state": profile.state.value, "failures": profile.failures}
+            for profile in self.profiles
+        ]
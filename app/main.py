@@ -5,10 +5,34 @@ This is the FastAPI application that serves as the main entry point
 for the AI-powered code review platform.
 """
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import review_router
 from app.core.config import settings
+from app.core.ai_engine import AIEngine
+from app.presenters.review_presenter import ReviewPresenter
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create application services inside the event loop and release them on shutdown."""
+    # Size the pool used by asyncio.to_thread for blocking static analysis
+    executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    asyncio.get_running_loop().set_default_executor(executor)
+    
+    app.state.ai_engine = AIEngine()
+    app.state.review_presenter = ReviewPresenter(app.state.ai_engine)
+    
+    # Warm provider connections so the first review skips the TLS handshake
+    await app.state.ai_engine.prewarm()
+    yield
+    
+    # Release pooled provider connections, then the worker threads
+    await app.state.ai_engine.aclose()
+    executor.shutdown(wait=False)
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -16,7 +40,8 @@ app = FastAPI(
     description="AI-powered platform for automated code review and analysis",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
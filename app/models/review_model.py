@@ -5,7 +5,7 @@ This module defines Pydantic models for data validation and serialization
 in the AI Code Reviewer application.
 """
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, validator
 from typing import List, Optional, Dict, Any, Union
 from enum import Enum
 from datetime import datetime
@@ -42,6 +42,7 @@ class ProgrammingLanguage(str, Enum):
 
 class CodeIssue(BaseModel):
     """Model for individual code issues."""
+    model_config = ConfigDict(frozen=True)
     type: IssueType
     severity: SeverityLevel
     line: Optional[int] = None
@@ -53,6 +54,7 @@ class CodeIssue(BaseModel):
 
 class CodeSuggestion(BaseModel):
     """Model for code improvement suggestions."""
+    model_config = ConfigDict(frozen=True)
     type: str
     description: str
     refactored_code: Optional[str] = None
@@ -61,6 +63,7 @@ class CodeSuggestion(BaseModel):
 
 class SecurityConcern(BaseModel):
     """Model for security-related issues."""
+    model_config = ConfigDict(frozen=True)
     type: str
     severity: SeverityLevel
     description: str
@@ -69,6 +72,7 @@ class SecurityConcern(BaseModel):
 
 class PerformanceNote(BaseModel):
     """Model for performance-related observations."""
+    model_config = ConfigDict(frozen=True)
     area: str
     issue: str
     suggestion: str
@@ -80,6 +84,8 @@ class StaticAnalysisResult(BaseModel):
     issues: List[CodeIssue]
     score: float = Field(ge=0.0, le=10.0)
     summary: str
+    # Set when the tool timed out, crashed or produced no report
+    _failed: bool = PrivateAttr(default=False)
 
 class AIAnalysisResult(BaseModel):
     """Model for AI analysis results."""
@@ -140,6 +146,10 @@ class BatchReviewRequest(BaseModel):
     include_static_analysis: bool = Field(default=True)
     include_ai_analysis: bool = Field(default=True)
     focus_areas: Optional[List[str]] = None
+    async_mode: bool = Field(
+        default=False,
+        description="Submit AI analysis to the provider's offline Batch API and return a job to poll"
+    )
 
 class BatchReviewResponse(BaseModel):
     """Model for batch code review responses."""
@@ -152,6 +162,15 @@ class BatchReviewResponse(BaseModel):
     overall_summary: str
     processing_time_ms: int
 
+class OfflineBatchJob(BaseModel):
+    """Model for batch reviews processed through the offline Batch API."""
+    batch_id: str
+    status: str
+    timestamp: datetime
+    total_files: int
+    failed_reviews: int = 0
+    reviews: Optional[List[CodeReviewResponse]] = None
+
 class ReviewHistory(BaseModel):
     """Model for review history tracking."""
     review_id: str
@@ -161,6 +180,9 @@ class ReviewHistory(BaseModel):
     overall_score: float
     total_issues: int
     summary: str
+    # Summary keyword flags for dashboard metrics, set once when stored
+    _has_security: bool = PrivateAttr(default=False)
+    _has_performance: bool = PrivateAttr(default=False)
 
 class DashboardMetrics(BaseModel):
     """Model for dashboard metrics."""
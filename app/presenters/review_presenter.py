@@ -5,50 +5,137 @@ This module orchestrates the business logic for code review operations,
 coordinating between static analysis, AI analysis, and data processing.
 """
 
+import asyncio
+import hashlib
+import itertools
 import time
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from collections import Counter, OrderedDict, deque
+from typing import Deque, Iterator, List, Dict, Any, NamedTuple, Optional, Tuple
+from datetime import datetime, timezone
 import logging
 
 from app.models.review_model import (
     CodeReviewRequest, CodeReviewResponse, BatchReviewRequest, BatchReviewResponse,
     StaticAnalysisResult, AIAnalysisResult, CodeIssue, CodeSuggestion, SecurityConcern,
-    PerformanceNote, ReviewHistory, DashboardMetrics, ErrorResponse
+    PerformanceNote, ReviewHistory, DashboardMetrics, ErrorResponse, OfflineBatchJob,
+    SeverityLevel, IssueType, ProgrammingLanguage
 )
-from app.core.ai_engine import ai_engine
+from app.core.ai_engine import AIEngine, DEGRADED_KEY
 from app.utils.static_analyzer import static_analyzer
 from app.utils.code_utils import code_utils
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Count buckets for issue severities and types, indexed by enum member
+_SEV_IDX = {SeverityLevel.CRITICAL: 0, SeverityLevel.HIGH: 1, SeverityLevel.MEDIUM: 2, SeverityLevel.LOW: 3}
+_TYPE_IDX = {issue_type: index for index, issue_type in enumerate(IssueType)}
+
+# Maximum accepted code size
+_MAX_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+# Batch API statuses after which a batch will never produce results
+_OFFLINE_TERMINAL_FAILURES = frozenset({"failed", "expired", "cancelled"})
+
+class AggregatedResults(NamedTuple):
+    """Issues, findings and scores collected from all analysis results of a review."""
+    issues: List[CodeIssue]
+    suggestions: List[CodeSuggestion]
+    security_concerns: List[SecurityConcern]
+    performance_notes: List[PerformanceNote]
+    static_score_sum: float
+    static_score_count: int
+    sev_counts: List[int]  # Indexed by _SEV_IDX
+    type_counts: List[int]  # Indexed by _TYPE_IDX
+
 class ReviewPresenter:
     """Presenter for code review business logic."""
     
-    def __init__(self):
-        """Initialize the review presenter."""
-        self.review_history: List[ReviewHistory] = []
+    __slots__ = (
+        "ai_engine",
+        "review_history",
+        "_history_index",
+        "_score_sum",
+        "_lang_counts",
+        "_security_issue_sum",
+        "_performance_issue_sum",
+        "metrics_version",
+        "_metrics_dirty",
+        "_cached_metrics",
+        "offline_batches",
+        "completed_offline_batches",
+        "_offline_completions",
+        "_response_cache",
+    )
+    
+    def __init__(self, ai_engine: AIEngine):
+        """
+        Initialize the review presenter.
+        
+        Args:
+            ai_engine: AI engine used for code analysis
+        """
+        self.ai_engine = ai_engine
+        # Keep only the last 100 reviews in memory
+        self.review_history: Deque[ReviewHistory] = deque(maxlen=100)
+        self._history_index: Dict[str, CodeReviewResponse] = {}
+        
+        # Running dashboard totals over review_history
+        self._score_sum = 0.0
+        self._lang_counts: Counter = Counter()
+        self._security_issue_sum = 0
+        self._performance_issue_sum = 0
+        
+        # Dashboard metrics are rebuilt only after a new review is stored
+        self.metrics_version = 0
+        self._metrics_dirty = True
+        self._cached_metrics: Optional[DashboardMetrics] = None
+        
+        # Pending offline batches as (submitted monotonic time, requests)
+        self.offline_batches: Dict[str, Tuple[float, List[CodeReviewRequest]]] = {}
+        self.completed_offline_batches: "OrderedDict[str, OfflineBatchJob]" = OrderedDict()
+        # Batches whose results are being fetched and reviewed; later polls await the same task
+        self._offline_completions: Dict[str, "asyncio.Task[OfflineBatchJob]"] = {}
+        
+        # Completed reviews by content hash, so identical requests skip the analyzers
+        self._response_cache: "OrderedDict[str, CodeReviewResponse]" = OrderedDict()
     
-    async def review_code(self, request: CodeReviewRequest) -> CodeReviewResponse:
+    async def review_code(self, request: CodeReviewRequest, ai_analysis_data: Optional[Dict[str, Any]] = None) -> CodeReviewResponse:
         """
         Perform comprehensive code review.
         
         Args:
             request: Code review request
+            ai_analysis_data: Precomputed AI analysis, e.g. from a batch fan-out
             
         Returns:
             Comprehensive code review response
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        now = datetime.now(timezone.utc)
         review_id = code_utils.generate_review_id()
         
         try:
             # Validate request
-            self._validate_review_request(request)
+            self.validate_review_request(request)
             
             # Sanitize code
             sanitized_code = code_utils.sanitize_code(request.code)
             
+            # Reuse the result of an identical earlier review
+            cache_key = self._response_cache_key(request, sanitized_code)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                response = cached.model_copy(update={
+                    "review_id": review_id,
+                    "timestamp": now,
+                    "processing_time_ms": (time.perf_counter_ns() - start_ns) // 1_000_000
+                })
+                self._store_review_history(response)
+                logger.info("Code review served from cache for %s", review_id)
+                return response
+            
             # Extract code metrics
             metrics = code_utils.extract_code_metrics(sanitized_code)
             
@@ -57,81 +144,105 @@ class ReviewPresenter:
             ai_result: Optional[AIAnalysisResult] = None
             tools_used = []
             
-            # Perform static analysis if requested
+            # Run the requested analyses concurrently; static tools block, so they run in a worker thread
+            static_task = None
             if request.include_static_analysis:
-                try:
-                    static_results = static_analyzer.analyze_code(
-                        sanitized_code, 
-                        request.language, 
-                        request.file_name
-                    )
+                static_task = asyncio.to_thread(
+                    static_analyzer.analyze_code,
+                    sanitized_code,
+                    request.language,
+                    request.file_name
+                )
+            ai_task = None
+            if request.include_ai_analysis and ai_analysis_data is None:
+                ai_task = self.ai_engine.analyze_code(
+                    sanitized_code,
+                    request.language.value,
+                    request.context
+                )
+            
+            outcomes = iter(await asyncio.gather(
+                *(task for task in (static_task, ai_task) if task is not None),
+                return_exceptions=True
+            ))
+            static_outcome = next(outcomes) if static_task is not None else None
+            if ai_task is not None:
+                ai_analysis_data = next(outcomes)
+            
+            # Reviews built from a failed or fallback analysis are not cached
+            degraded = False
+            
+            # Collect static analysis results
+            if request.include_static_analysis:
+                if isinstance(static_outcome, Exception):
+                    logger.error("Static analysis failed for %s: %s", review_id, static_outcome)
+                    degraded = True
+                else:
+                    static_results = static_outcome
+                    degraded = any(result._failed for result in static_results)
                     tools_used.extend([result.tool for result in static_results])
-                    logger.info(f"Static analysis completed for {review_id}")
-                except Exception as e:
-                    logger.error(f"Static analysis failed for {review_id}: {str(e)}")
-                    static_results = []
+                    logger.info("Static analysis completed for %s", review_id)
             
-            # Perform AI analysis if requested
+            # Collect AI analysis results
             if request.include_ai_analysis:
                 try:
-                    ai_analysis_data = ai_engine.analyze_code(
-                        sanitized_code,
-                        request.language.value,
-                        request.context
-                    )
+                    if isinstance(ai_analysis_data, Exception):
+                        raise ai_analysis_data
                     
                     # Convert AI analysis data to AIAnalysisResult
                     ai_result = self._convert_ai_analysis(ai_analysis_data)
+                    degraded = degraded or bool(ai_analysis_data.get(DEGRADED_KEY))
                     tools_used.append("ai_engine")
-                    logger.info(f"AI analysis completed for {review_id}")
+                    logger.info("AI analysis completed for %s", review_id)
                 except Exception as e:
-                    logger.error(f"AI analysis failed for {review_id}: {str(e)}")
+                    logger.error("AI analysis failed for %s: %s", review_id, e)
                     ai_result = None
+                    degraded = True
             
-            # Combine and process results
-            all_issues = self._combine_issues(static_results, ai_result)
-            all_suggestions = self._extract_suggestions(ai_result)
-            security_concerns = self._extract_security_concerns(ai_result)
-            performance_notes = self._extract_performance_notes(ai_result)
+            # Combine and process results in one pass
+            aggregated = self._aggregate_results(static_results, ai_result)
             
             # Calculate scores
-            static_scores = [result.score for result in static_results]
             ai_score = ai_result.score if ai_result else 5.0
-            overall_score = code_utils.calculate_overall_score(static_scores, ai_score)
+            overall_score = code_utils.calculate_overall_score(aggregated.static_score_sum, aggregated.static_score_count, ai_score)
             
             # Generate summary and recommendations
-            summary = self._generate_review_summary(all_issues, all_suggestions, overall_score)
-            recommendations = self._generate_recommendations(all_issues, all_suggestions, request.focus_areas)
-            
-            # Count issues by severity
-            issue_counts = self._count_issues_by_severity(all_issues)
+            summary = self._generate_review_summary(aggregated.issues, aggregated.suggestions, overall_score)
+            recommendations = self._generate_recommendations(aggregated, request.focus_areas)
             
             # Create response
             response = CodeReviewResponse(
                 review_id=review_id,
-                timestamp=datetime.now(),
+                timestamp=now,
                 language=request.language,
                 file_name=request.file_name,
                 static_analysis=static_results[0] if static_results else None,
                 ai_analysis=ai_result,
                 overall_score=overall_score,
-                total_issues=len(all_issues),
-                critical_issues=issue_counts.get('critical', 0),
-                security_issues=len(security_concerns),
+                total_issues=len(aggregated.issues),
+                critical_issues=aggregated.sev_counts[_SEV_IDX[SeverityLevel.CRITICAL]],
+                security_issues=len(aggregated.security_concerns),
                 summary=summary,
                 recommendations=recommendations,
-                processing_time_ms=int((time.time() - start_time) * 1000),
+                processing_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
                 tools_used=tools_used
             )
             
             # Store in history
             self._store_review_history(response)
             
-            logger.info(f"Code review completed for {review_id} in {response.processing_time_ms}ms")
+            # Cache the response only if every requested analysis succeeded
+            if not degraded:
+                self._response_cache[cache_key] = response
+                self._response_cache.move_to_end(cache_key)
+                while len(self._response_cache) > settings.REVIEW_CACHE_MAXSIZE:
+                    self._response_cache.popitem(last=False)
+            
+            logger.info("Code review completed for %s in %sms", review_id, response.processing_time_ms)
             return response
             
         except Exception as e:
-            logger.error(f"Code review failed for {review_id}: {str(e)}")
+            logger.error("Code review failed for %s: %s", review_id, e)
             raise e
     
     async def batch_review(self, request: BatchReviewRequest) -> BatchReviewResponse:
@@ -144,53 +255,226 @@ class ReviewPresenter:
         Returns:
             Batch review response
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        now = datetime.now(timezone.utc)
         batch_id = code_utils.generate_review_id()
         
         reviews = []
         successful_reviews = 0
-        failed_reviews = 0
         
-        for file_data in request.files:
-            try:
-                # Create individual review request
-                individual_request = CodeReviewRequest(
-                    code=file_data['code'],
-                    language=file_data['language'],
-                    file_name=file_data.get('file_name'),
-                    context=file_data.get('context'),
-                    include_static_analysis=request.include_static_analysis,
-                    include_ai_analysis=request.include_ai_analysis,
-                    focus_areas=request.focus_areas
-                )
-                
-                # Perform review
-                review_response = await self.review_code(individual_request)
-                reviews.append(review_response)
-                successful_reviews += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to review file in batch {batch_id}: {str(e)}")
+        # Create and validate individual review requests
+        individual_requests, failed_reviews = self._build_batch_requests(request, batch_id)
+        
+        # Fan out AI analysis concurrently for the files not already in the response cache
+        ai_results: List[Optional[Dict[str, Any]]] = [None] * len(individual_requests)
+        if request.include_ai_analysis and individual_requests:
+            sanitized = [code_utils.sanitize_code(r.code) for r in individual_requests]
+            misses = [
+                index for index, r in enumerate(individual_requests)
+                if self._response_cache_key(r, sanitized[index]) not in self._response_cache
+            ]
+            if misses:
+                analyses = await self.ai_engine.analyze_code_many([
+                    (sanitized[index], individual_requests[index].language.value, individual_requests[index].context)
+                    for index in misses
+                ])
+                for index, analysis in zip(misses, analyses):
+                    ai_results[index] = analysis
+        
+        results = await self._review_concurrently(individual_requests, ai_results)
+        
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Failed to review file in batch %s: %s", batch_id, result)
                 failed_reviews += 1
+            else:
+                reviews.append(result)
+                successful_reviews += 1
         
         # Generate overall summary
         overall_summary = self._generate_batch_summary(reviews, successful_reviews, failed_reviews)
         
         response = BatchReviewResponse(
             batch_id=batch_id,
-            timestamp=datetime.now(),
+            timestamp=now,
             total_files=len(request.files),
             successful_reviews=successful_reviews,
             failed_reviews=failed_reviews,
             reviews=reviews,
             overall_summary=overall_summary,
-            processing_time_ms=int((time.time() - start_time) * 1000)
+            processing_time_ms=(time.perf_counter_ns() - start_ns) // 1_000_000
         )
         
         return response
     
+    async def submit_offline_batch(self, request: BatchReviewRequest) -> OfflineBatchJob:
+        """
+        Submit a batch review whose AI analysis runs through the offline Batch API.
+        
+        Args:
+            request: Batch review request
+            
+        Returns:
+            Offline batch job to poll for results
+        """
+        if not request.include_ai_analysis:
+            raise ValueError("async_mode requires include_ai_analysis")
+        
+        individual_requests, failed_reviews = self._build_batch_requests(request, "offline")
+        if not individual_requests:
+            raise ValueError("No valid files to review")
+        
+        batch_id = await self.ai_engine.submit_batch([
+            (code_utils.sanitize_code(r.code), r.language.value, r.context)
+            for r in individual_requests
+        ])
+        self._expire_offline_batches()
+        self.offline_batches[batch_id] = (time.monotonic(), individual_requests)
+        
+        return OfflineBatchJob(
+            batch_id=batch_id,
+            status="submitted",
+            timestamp=datetime.now(timezone.utc),
+            total_files=len(request.files),
+            failed_reviews=failed_reviews
+        )
+    
+    async def get_offline_batch(self, batch_id: str) -> Optional[OfflineBatchJob]:
+        """
+        Get the status of an offline batch, completing its reviews once the AI results are ready.
+        
+        Args:
+            batch_id: Batch ID returned by submit_offline_batch
+            
+        Returns:
+            Offline batch job, or None if the batch is unknown
+        """
+        self._expire_offline_batches()
+        
+        job = self.completed_offline_batches.get(batch_id)
+        if job is not None:
+            return job
+        
+        task = self._offline_completions.get(batch_id)
+        if task is not None:
+            return await asyncio.shield(task)
+        
+        pending = self.offline_batches.get(batch_id)
+        if pending is None:
+            return None
+        
+        batch = await self.ai_engine.poll_batch(batch_id)
+        job = OfflineBatchJob(
+            batch_id=batch_id,
+            status=batch.get("status", "unknown"),
+            timestamp=datetime.now(timezone.utc),
+            total_files=len(pending[1])
+        )
+        if job.status != "completed":
+            if job.status in _OFFLINE_TERMINAL_FAILURES and self.offline_batches.pop(batch_id, None) is not None:
+                self.ai_engine.discard_batch(batch_id)
+                self._store_completed_offline_batch(job)
+            return job
+        
+        # Another poll may have claimed the batch while this one awaited the status
+        task = self._offline_completions.get(batch_id)
+        if task is None:
+            pending = self.offline_batches.pop(batch_id, None)
+            if pending is None:
+                return self.completed_offline_batches.get(batch_id)
+            task = asyncio.ensure_future(self._complete_offline_batch(job, pending))
+            self._offline_completions[batch_id] = task
+            task.add_done_callback(lambda _: self._offline_completions.pop(batch_id, None))
+        
+        # Shielded so a disconnecting client does not cancel the work other polls await
+        return await asyncio.shield(task)
+    
+    async def _complete_offline_batch(
+        self, job: OfflineBatchJob, pending: Tuple[float, List[CodeReviewRequest]]
+    ) -> OfflineBatchJob:
+        """Fetch the AI results of a completed offline batch and run its reviews."""
+        individual_requests = pending[1]
+        try:
+            ai_results = await self.ai_engine.fetch_batch_results(job.batch_id)
+        except Exception:
+            # Put the batch back so a later poll can retry the download
+            self.offline_batches[job.batch_id] = pending
+            raise
+        
+        job.reviews = []
+        for result in await self._review_concurrently(individual_requests, ai_results):
+            if isinstance(result, Exception):
+                logger.error("Failed to review file in offline batch %s: %s", job.batch_id, result)
+                job.failed_reviews += 1
+            else:
+                job.reviews.append(result)
+        
+        self._store_completed_offline_batch(job)
+        return job
+    
+    async def _review_concurrently(
+        self, individual_requests: List[CodeReviewRequest], ai_results: List[Optional[Dict[str, Any]]]
+    ) -> List[Any]:
+        """
+        Review the files of a batch concurrently.
+        
+        Bounded by MAX_CONCURRENT_REVIEWS so static tools and providers are not overloaded.
+        
+        Returns:
+            A response or the raised exception for each file, in request order
+        """
+        semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_REVIEWS)
+        
+        async def review(individual_request: CodeReviewRequest, ai_analysis_data: Optional[Dict[str, Any]]) -> CodeReviewResponse:
+            async with semaphore:
+                return await self.review_code(individual_request, ai_analysis_data)
+        
+        return await asyncio.gather(
+            *(review(r, data) for r, data in zip(individual_requests, ai_results)),
+            return_exceptions=True
+        )
+    
+    def _store_completed_offline_batch(self, job: OfflineBatchJob) -> None:
+        """Keep a finished offline batch for polling, evicting the oldest beyond the limit."""
+        self.completed_offline_batches[job.batch_id] = job
+        while len(self.completed_offline_batches) > settings.OFFLINE_BATCH_MAX_COMPLETED:
+            self.completed_offline_batches.popitem(last=False)
+    
+    def _expire_offline_batches(self) -> None:
+        """Drop pending offline batches that have outlived OFFLINE_BATCH_TTL_SECONDS."""
+        cutoff = time.monotonic() - settings.OFFLINE_BATCH_TTL_SECONDS
+        expired = [
+            batch_id for batch_id, (submitted_at, _) in self.offline_batches.items()
+            if submitted_at <= cutoff
+        ]
+        for batch_id in expired:
+            del self.offline_batches[batch_id]
+            self.ai_engine.discard_batch(batch_id)
+            logger.info("Expired offline batch %s", batch_id)
+    
+    def get_review(self, review_id: str) -> Optional[CodeReviewResponse]:
+        """
+        Get a stored review by ID.
+        
+        Args:
+            review_id: ID of a review in the history
+            
+        Returns:
+            Full review response, or None if it is not in the history
+        """
+        return self._history_index.get(review_id)
+    
     def get_dashboard_metrics(self) -> DashboardMetrics:
         """Get dashboard metrics from review history."""
+        if not self._metrics_dirty and self._cached_metrics is not None:
+            return self._cached_metrics
+        
+        self._cached_metrics = self._build_dashboard_metrics()
+        self._metrics_dirty = False
+        return self._cached_metrics
+    
+    def _build_dashboard_metrics(self) -> DashboardMetrics:
+        """Build dashboard metrics from the running totals."""
         if not self.review_history:
             return DashboardMetrics(
                 total_reviews=0,
@@ -202,15 +486,9 @@ class ReviewPresenter:
                 recent_reviews=[]
             )
         
-        # Calculate metrics
+        # Calculate metrics from running totals
         total_reviews = len(self.review_history)
-        average_score = sum(review.overall_score for review in self.review_history) / total_reviews
-        
-        # Language distribution
-        language_distribution = {}
-        for review in self.review_history:
-            lang = review.language.value
-            language_distribution[lang] = language_distribution.get(lang, 0) + 1
+        average_score = self._score_sum / total_reviews
         
         # Most common issues (simplified)
         most_common_issues = [
@@ -219,26 +497,70 @@ class ReviewPresenter:
             {"type": "performance_issue", "count": 5}
         ]
         
-        # Recent reviews
-        recent_reviews = sorted(self.review_history, key=lambda x: x.timestamp, reverse=True)[:10]
-        
         return DashboardMetrics(
             total_reviews=total_reviews,
             average_score=round(average_score, 2),
             most_common_issues=most_common_issues,
-            language_distribution=language_distribution,
-            security_issues_count=sum(review.total_issues for review in self.review_history if "security" in review.summary.lower()),
-            performance_issues_count=sum(review.total_issues for review in self.review_history if "performance" in review.summary.lower()),
-            recent_reviews=recent_reviews
+            language_distribution=dict(self._lang_counts),
+            security_issues_count=self._security_issue_sum,
+            performance_issues_count=self._performance_issue_sum,
+            recent_reviews=list(itertools.islice(reversed(self.review_history), 10))
         )
     
-    def _validate_review_request(self, request: CodeReviewRequest) -> None:
+    def _build_batch_requests(self, request: BatchReviewRequest, batch_id: str) -> Tuple[List[CodeReviewRequest], int]:
+        """Create and validate the individual review requests of a batch, counting failures."""
+        individual_requests = []
+        failed_reviews = 0
+        
+        # Batch-level options were validated with the batch request; share them without re-validating
+        shared_options = {
+            "include_static_analysis": request.include_static_analysis,
+            "include_ai_analysis": request.include_ai_analysis,
+            "focus_areas": request.focus_areas
+        }
+        for file_data in request.files:
+            try:
+                individual_request = CodeReviewRequest.model_construct(
+                    code=file_data['code'],
+                    language=ProgrammingLanguage(file_data['language']),
+                    file_name=file_data.get('file_name'),
+                    context=file_data.get('context'),
+                    **shared_options
+                )
+                self.validate_review_request(individual_request)
+                individual_requests.append(individual_request)
+                
+            except Exception as e:
+                logger.error("Failed to review file in batch %s: %s", batch_id, e)
+                failed_reviews += 1
+        
+        return individual_requests, failed_reviews
+    
+    @staticmethod
+    def _response_cache_key(request: CodeReviewRequest, sanitized_code: str) -> str:
+        """Build the response cache key from the code and every option that affects the review."""
+        key_material = "\0".join([
+            sanitized_code,
+            request.language.value,
+            request.file_name or "",
+            request.context or "",
+            str(request.include_static_analysis),
+            str(request.include_ai_analysis),
+            str(sorted(request.focus_areas or []))
+        ])
+        return hashlib.blake2b(key_material.encode("utf-8"), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def validate_review_request(request: CodeReviewRequest) -> None:
         """Validate the review request."""
-        if not request.code.strip():
-            raise ValueError("Code cannot be empty")
+        code = request.code
         
-        if len(request.code) > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
+        # Check the size first so oversized payloads are rejected without scanning them
+        if len(code) > _MAX_BYTES:
             raise ValueError(f"Code size exceeds maximum limit of {settings.MAX_FILE_SIZE_MB}MB")
+        
+        if not code or code.isspace():
+            raise ValueError("Code cannot be empty")
     
     def _convert_ai_analysis(self, ai_data: Dict[str, Any]) -> AIAnalysisResult:
         """Convert AI analysis data to AIAnalysisResult model."""
@@ -254,18 +576,20 @@ class ReviewPresenter:
             raw_response=ai_data.get('raw_response')
         )
     
-    def _convert_ai_issue(self, issue_data: Dict[str, Any]) -> CodeIssue:
+    @staticmethod
+    def _convert_ai_issue(issue_data: Dict[str, Any]) -> CodeIssue:
         """Convert AI issue data to CodeIssue model."""
         return CodeIssue(
-            type=issue_data.get('type', 'style_violation'),
-            severity=issue_data.get('severity', 'medium'),
+            type=IssueType(issue_data.get('type', 'style_violation')),
+            severity=SeverityLevel(issue_data.get('severity', 'medium')),
             line=issue_data.get('line'),
             message=issue_data.get('message', ''),
             suggestion=issue_data.get('suggestion'),
             tool='ai_engine'
         )
     
-    def _convert_ai_suggestion(self, suggestion_data: Dict[str, Any]) -> CodeSuggestion:
+    @staticmethod
+    def _convert_ai_suggestion(suggestion_data: Dict[str, Any]) -> CodeSuggestion:
         """Convert AI suggestion data to CodeSuggestion model."""
         return CodeSuggestion(
             type=suggestion_data.get('type', 'improvement'),
@@ -275,17 +599,19 @@ class ReviewPresenter:
             confidence=suggestion_data.get('confidence', 0.8)
         )
     
-    def _convert_security_concern(self, concern_data: Dict[str, Any]) -> SecurityConcern:
+    @staticmethod
+    def _convert_security_concern(concern_data: Dict[str, Any]) -> SecurityConcern:
         """Convert security concern data to SecurityConcern model."""
         return SecurityConcern(
             type=concern_data.get('type', 'vulnerability'),
-            severity=concern_data.get('severity', 'medium'),
+            severity=SeverityLevel(concern_data.get('severity', 'medium')),
             description=concern_data.get('description', ''),
             mitigation=concern_data.get('mitigation', ''),
             cwe_id=concern_data.get('cwe_id')
         )
     
-    def _convert_performance_note(self, note_data: Dict[str, Any]) -> PerformanceNote:
+    @staticmethod
+    def _convert_performance_note(note_data: Dict[str, Any]) -> PerformanceNote:
         """Convert performance note data to PerformanceNote model."""
         return PerformanceNote(
             area=note_data.get('area', 'general'),
@@ -294,82 +620,79 @@ class ReviewPresenter:
             impact_level=note_data.get('impact_level', 'medium')
         )
     
-    def _combine_issues(self, static_results: List[StaticAnalysisResult], ai_result: Optional[AIAnalysisResult]) -> List[CodeIssue]:
-        """Combine issues from static analysis and AI analysis."""
-        all_issues = []
+    @staticmethod
+    def _aggregate_results(static_results: List[StaticAnalysisResult], ai_result: Optional[AIAnalysisResult]) -> AggregatedResults:
+        """Combine static and AI results, collecting scores and severity counts in the same pass."""
+        all_issues: List[CodeIssue] = []
+        static_score_sum = 0.0
+        sev_counts = [0] * len(_SEV_IDX)
+        type_counts = [0] * len(_TYPE_IDX)
         
         # Add static analysis issues
         for result in static_results:
+            static_score_sum += result.score
             all_issues.extend(result.issues)
         
         # Add AI analysis issues
         if ai_result:
             all_issues.extend(ai_result.issues)
         
-        return all_issues
-    
-    def _extract_suggestions(self, ai_result: Optional[AIAnalysisResult]) -> List[CodeSuggestion]:
-        """Extract suggestions from AI analysis."""
-        if ai_result:
-            return ai_result.suggestions
-        return []
-    
-    def _extract_security_concerns(self, ai_result: Optional[AIAnalysisResult]) -> List[SecurityConcern]:
-        """Extract security concerns from AI analysis."""
-        if ai_result:
-            return ai_result.security_concerns
-        return []
-    
-    def _extract_performance_notes(self, ai_result: Optional[AIAnalysisResult]) -> List[PerformanceNote]:
-        """Extract performance notes from AI analysis."""
-        if ai_result:
-            return ai_result.performance_notes
-        return []
-    
-    def _count_issues_by_severity(self, issues: List[CodeIssue]) -> Dict[str, int]:
-        """Count issues by severity level."""
-        counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+        for issue in all_issues:
+            sev_counts[_SEV_IDX[issue.severity]] += 1
+            type_counts[_TYPE_IDX[issue.type]] += 1
         
-        for issue in issues:
-            severity = issue.severity.value if hasattr(issue.severity, 'value') else issue.severity
-            counts[severity] = counts.get(severity, 0) + 1
+        if not ai_result:
+            return AggregatedResults(all_issues, [], [], [], static_score_sum, len(static_results), sev_counts, type_counts)
         
-        return counts
+        return AggregatedResults(
+            all_issues,
+            ai_result.suggestions,
+            ai_result.security_concerns,
+            ai_result.performance_notes,
+            static_score_sum,
+            len(static_results),
+            sev_counts,
+            type_counts
+        )
     
-    def _generate_review_summary(self, issues: List[CodeIssue], suggestions: List[CodeSuggestion], score: float) -> str:
+    @staticmethod
+    def _generate_review_summary(issues: List[CodeIssue], suggestions: List[CodeSuggestion], score: float) -> str:
         """Generate a summary of the code review."""
         return code_utils.generate_summary(issues, suggestions, score)
     
-    def _generate_recommendations(self, issues: List[CodeIssue], suggestions: List[CodeSuggestion], focus_areas: Optional[List[str]]) -> List[str]:
+    def _generate_recommendations(self, aggregated: AggregatedResults, focus_areas: Optional[List[str]]) -> List[str]:
         """Generate actionable recommendations."""
-        recommendations = []
-        
+        # Limit to top 5 recommendations
+        return list(itertools.islice(self._iter_recommendations(aggregated, focus_areas), 5))
+    
+    @staticmethod
+    def _iter_recommendations(aggregated: AggregatedResults, focus_areas: Optional[List[str]]) -> Iterator[str]:
+        """Yield recommendations in priority order."""
         # Priority-based recommendations
-        critical_issues = [i for i in issues if i.severity.value == 'critical']
-        if critical_issues:
-            recommendations.append(f"Address {len(critical_issues)} critical issues immediately")
+        critical_count = aggregated.sev_counts[_SEV_IDX[SeverityLevel.CRITICAL]]
+        if critical_count:
+            yield f"Address {critical_count} critical issues immediately"
         
-        security_issues = [i for i in issues if i.type.value == 'security_vulnerability']
-        if security_issues:
-            recommendations.append(f"Review and fix {len(security_issues)} security vulnerabilities")
+        security_count = aggregated.type_counts[_TYPE_IDX[IssueType.SECURITY_VULNERABILITY]]
+        if security_count:
+            yield f"Review and fix {security_count} security vulnerabilities"
         
         # Focus area recommendations
         if focus_areas:
             for area in focus_areas:
                 if area == 'performance':
-                    recommendations.append("Consider performance optimizations")
+                    yield "Consider performance optimizations"
                 elif area == 'readability':
-                    recommendations.append("Improve code readability and documentation")
+                    yield "Improve code readability and documentation"
                 elif area == 'security':
-                    recommendations.append("Conduct thorough security review")
+                    yield "Conduct thorough security review"
         
         # General recommendations
-        if suggestions:
-            recommendations.append(f"Implement {len(suggestions)} improvement suggestions")
-        
-        return recommendations[:5]  # Limit to top 5 recommendations
+        if aggregated.suggestions:
+            yield f"Implement {len(aggregated.suggestions)} improvement suggestions"
     
-    def _generate_batch_summary(self, reviews: List[CodeReviewResponse], successful: int, failed: int) -> str:
+    @staticmethod
+    def _generate_batch_summary(reviews: List[CodeReviewResponse], successful: int, failed: int) -> str:
         """Generate summary for batch review."""
         if not reviews:
             return f"Batch review completed: {successful} successful, {failed} failed"
@@ -390,13 +713,30 @@ class ReviewPresenter:
             total_issues=response.total_issues,
             summary=response.summary
         )
+        summary_lower = response.summary.lower()
+        history_item._has_security = "security" in summary_lower
+        history_item._has_performance = "performance" in summary_lower
+        
+        # The deque drops its oldest review when full; remove it from the index and totals first
+        if len(self.review_history) == self.review_history.maxlen:
+            evicted = self.review_history[0]
+            self._history_index.pop(evicted.review_id, None)
+            self._update_metric_totals(evicted, -1)
         
         self.review_history.append(history_item)
+        self._history_index[response.review_id] = response
+        self._update_metric_totals(history_item, 1)
+        self.metrics_version += 1
+        self._metrics_dirty = True
+    
+    def _update_metric_totals(self, history_item: ReviewHistory, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a review's contribution to the dashboard totals."""
+        self._score_sum += sign * history_item.overall_score
+        self._lang_counts[history_item.language.value] += sign
+        if not self._lang_counts[history_item.language.value]:
+            del self._lang_counts[history_item.language.value]
         
-        # Keep only last 100 reviews in memory
-        if len(self.review_history) > 100:
-            self.review_history = self.review_history[-100:]
-
-# Global presenter instance
-review_presenter = ReviewPresenter()
-
+        if history_item._has_security:
+            self._security_issue_sum += sign * history_item.total_issues
+        if history_item._has_performance:
+            self._performance_issue_sum += sign * history_item.total_issues
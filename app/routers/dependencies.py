@@ -0,0 +1,19 @@
+"""
+Router Dependencies
+
+This module exposes the application-scoped services created in the
+FastAPI lifespan to route handlers via Depends.
+"""
+
+from fastapi import Request
+
+from app.core.ai_engine import AIEngine
+from app.presenters.review_presenter import ReviewPresenter
+
+def get_ai_engine(request: Request) -> AIEngine:
+    """Return the AI engine created at application startup."""
+    return request.app.state.ai_engine
+
+def get_review_presenter(request: Request) -> ReviewPresenter:
+    """Return the review presenter created at application startup."""
+    return request.app.state.review_presenter
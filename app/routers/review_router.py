@@ -5,25 +5,34 @@ This module defines FastAPI routes for the code review endpoints,
 handling HTTP requests and responses.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Union
 import logging
+import secrets
 
 from app.models.review_model import (
     CodeReviewRequest, CodeReviewResponse, BatchReviewRequest, BatchReviewResponse,
-    DashboardMetrics, ErrorResponse, ProgrammingLanguage
+    DashboardMetrics, ErrorResponse, OfflineBatchJob, ProgrammingLanguage
 )
-from app.presenters.review_presenter import review_presenter
-from app.core.config import settings
+from app.core.ai_engine import AIEngine
+from app.presenters.review_presenter import ReviewPresenter
+from app.routers.dependencies import get_ai_engine, get_review_presenter
+from app.utils.code_utils import code_utils
+from app.core.config import settings, get_api_keys
 
 logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter()
 
+_SUPPORTED_LANGS = tuple(lang.value for lang in ProgrammingLanguage)
+
+# Per-process nonce so metrics versions from another worker or an earlier run never match
+_ETAG_NONCE = secrets.token_hex(8)
+
 @router.post("/review", response_model=CodeReviewResponse)
-async def review_code(request: CodeReviewRequest):
+async def review_code(request: CodeReviewRequest, presenter: ReviewPresenter = Depends(get_review_presenter)):
     """
     Review a single code file.
     
@@ -33,93 +42,133 @@ async def review_code(request: CodeReviewRequest):
     - Code quality scoring and suggestions
     """
     try:
-        logger.info(f"Starting code review for {request.language} code")
+        logger.info("Starting code review for %s code", request.language)
         
         # Validate file extension if file_name is provided
         if request.file_name:
+            lang_value = request.language.value
             detected_lang = code_utils.detect_language_from_filename(request.file_name)
-            if detected_lang and detected_lang != request.language.value:
-                logger.warning(f"Language mismatch: detected {detected_lang}, specified {request.language.value}")
+            if detected_lang and detected_lang != lang_value:
+                logger.warning("Language mismatch: detected %s, specified %s", detected_lang, lang_value)
         
         # Perform review
-        response = await review_presenter.review_code(request)
+        response = await presenter.review_code(request)
         
-        logger.info(f"Code review completed: {response.review_id}")
+        logger.info("Code review completed: %s", response.review_id)
         return response
         
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Code review failed: {str(e)}")
+        logger.error("Code review failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Code review failed: {str(e)}")
 
-@router.post("/review/batch", response_model=BatchReviewResponse)
-async def batch_review(request: BatchReviewRequest):
+@router.post("/review/stream")
+async def review_code_stream(request: CodeReviewRequest, ai_engine: AIEngine = Depends(get_ai_engine)):
+    """
+    Stream AI analysis of a single code file.
+    
+    This endpoint streams the AI provider's JSON analysis as it is generated,
+    so clients can render partial results before the review completes.
+    Static analysis is not included; use /review for the full report.
+    A response that fails part-way ends with STREAM_ERROR_MARKER followed
+    by a JSON error object.
+    """
+    # Same size and emptiness checks as /review, before the code is scanned
+    try:
+        ReviewPresenter.validate_review_request(request)
+    except ValueError as e:
+        logger.error("Validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info("Starting streaming AI review for %s code", request.language)
+    sanitized_code = code_utils.sanitize_code(request.code)
+    
+    return StreamingResponse(
+        ai_engine.analyze_code_stream(sanitized_code, request.language.value, request.context),
+        media_type="text/plain"
+    )
+
+@router.post("/review/batch", response_model=Union[BatchReviewResponse, OfflineBatchJob])
+async def batch_review(request: BatchReviewRequest, presenter: ReviewPresenter = Depends(get_review_presenter)):
     """
     Review multiple code files in batch.
     
     This endpoint allows reviewing multiple files at once for efficiency.
     Useful for reviewing entire projects or multiple related files.
+    With async_mode, AI analysis is submitted to the provider's Batch API
+    and a job is returned; poll /review/batch/{batch_id} for the results.
     """
     try:
-        logger.info(f"Starting batch review for {len(request.files)} files")
+        logger.info("Starting batch review for %s files", len(request.files))
         
         # Validate batch size
         if len(request.files) > 50:  # Limit batch size
             raise HTTPException(status_code=400, detail="Batch size cannot exceed 50 files")
         
+        if request.async_mode:
+            job = await presenter.submit_offline_batch(request)
+            logger.info("Offline batch review submitted: %s", job.batch_id)
+            return job
+        
         # Perform batch review
-        response = await review_presenter.batch_review(request)
+        response = await presenter.batch_review(request)
         
-        logger.info(f"Batch review completed: {response.batch_id}")
+        logger.info("Batch review completed: %s", response.batch_id)
         return response
         
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Batch review failed: {str(e)}")
+        logger.error("Batch review failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Batch review failed: {str(e)}")
 
+@router.get("/review/batch/{batch_id}", response_model=OfflineBatchJob)
+async def get_offline_batch(batch_id: str, presenter: ReviewPresenter = Depends(get_review_presenter)):
+    """
+    Get the status of an offline batch review.
+    
+    Reviews are included once the provider has completed the batch.
+    """
+    try:
+        job = await presenter.get_offline_batch(batch_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return job
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get offline batch %s: %s", batch_id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve batch: {str(e)}")
+
 @router.get("/review/{review_id}", response_model=CodeReviewResponse)
-async def get_review(review_id: str):
+async def get_review(review_id: str, presenter: ReviewPresenter = Depends(get_review_presenter)):
     """
     Get a specific review by ID.
     
     This endpoint retrieves the results of a previously performed code review.
     """
     try:
-        # Find review in history
-        for review in review_presenter.review_history:
-            if review.review_id == review_id:
-                # Convert ReviewHistory back to CodeReviewResponse
-                # This is a simplified version - in production, you'd store full responses
-                return CodeReviewResponse(
-                    review_id=review.review_id,
-                    timestamp=review.timestamp,
-                    language=review.language,
-                    file_name=review.file_name,
-                    overall_score=review.overall_score,
-                    total_issues=review.total_issues,
-                    critical_issues=0,  # Would need to store this
-                    security_issues=0,  # Would need to store this
-                    summary=review.summary,
-                    recommendations=[],  # Would need to store this
-                    processing_time_ms=0,  # Would need to store this
-                    tools_used=[]  # Would need to store this
-                )
-        
-        raise HTTPException(status_code=404, detail="Review not found")
+        review = presenter.get_review(review_id)
+        if review is None:
+            raise HTTPException(status_code=404, detail="Review not found")
+        return review
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get review {review_id}: {str(e)}")
+        logger.error("Failed to get review %s: %s", review_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to retrieve review: {str(e)}")
 
 @router.get("/dashboard/metrics", response_model=DashboardMetrics)
-async def get_dashboard_metrics():
+async def get_dashboard_metrics(
+    request: Request,
+    response: Response,
+    presenter: ReviewPresenter = Depends(get_review_presenter)
+):
     """
     Get dashboard metrics and statistics.
     
@@ -129,13 +178,21 @@ async def get_dashboard_metrics():
     - Most common issues
     - Language distribution
     - Security and performance issue counts
+    
+    Responses carry an ETag that changes when a review is stored, so polling
+    clients can send If-None-Match and receive 304 Not Modified.
     """
     try:
-        metrics = review_presenter.get_dashboard_metrics()
+        etag = f'"{_ETAG_NONCE}-{presenter.metrics_version}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        metrics = presenter.get_dashboard_metrics()
+        response.headers["ETag"] = etag
         return metrics
         
     except Exception as e:
-        logger.error(f"Failed to get dashboard metrics: {str(e)}")
+        logger.error("Failed to get dashboard metrics: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to retrieve metrics: {str(e)}")
 
 @router.get("/languages", response_model=List[str])
@@ -145,13 +202,14 @@ async def get_supported_languages():
     
     Returns the list of programming languages that the AI Code Reviewer supports.
     """
-    return [lang.value for lang in ProgrammingLanguage]
+    return _SUPPORTED_LANGS
 
 @router.post("/refactor")
 async def refactor_code(
     code: str,
     language: ProgrammingLanguage,
-    improvement_type: str = "readability"
+    improvement_type: str = "readability",
+    ai_engine: AIEngine = Depends(get_ai_engine)
 ):
     """
     Generate refactored code suggestions.
@@ -164,7 +222,7 @@ async def refactor_code(
             raise HTTPException(status_code=400, detail="Code cannot be empty")
         
         # Generate refactored code using AI engine
-        refactored_code = ai_engine.generate_refactored_code(code, language.value, improvement_type)
+        refactored_code = await ai_engine.generate_refactored_code(code, language.value, improvement_type)
         
         return {
             "original_code": code,
@@ -174,11 +232,11 @@ async def refactor_code(
         }
         
     except Exception as e:
-        logger.error(f"Code refactoring failed: {str(e)}")
+        logger.error("Code refactoring failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Code refactoring failed: {str(e)}")
 
 @router.get("/health")
-async def health_check():
+async def health_check(ai_engine: AIEngine = Depends(get_ai_engine)):
     """
     Health check endpoint.
     
@@ -186,7 +244,7 @@ async def health_check():
     """
     try:
         # Check if AI engine is available
-        ai_available = bool(settings.OPENAI_API_KEY or settings.COHERE_API_KEY or settings.ANTHROPIC_API_KEY)
+        ai_available = bool(ai_engine.provider_chain.profiles)
         
         # Check static analysis tools
         static_tools_available = {
@@ -199,11 +257,14 @@ async def health_check():
             "status": "healthy",
             "ai_engine_available": ai_available,
             "static_tools": static_tools_available,
+            "ai_providers": ai_engine.provider_chain.stats(),
+            "llm_cache": ai_engine.cache.stats(),
+            "connection_pool_prewarmed_at": ai_engine.last_prewarm_ts,
             "version": settings.VERSION
         }
         
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e, exc_info=True)
         return JSONResponse(
             status_code=503,
             content={"status": "unhealthy", "error": str(e)}
@@ -225,11 +286,7 @@ async def get_configuration():
             "eslint": settings.ESLINT_ENABLED,
             "bandit": settings.BANDIT_ENABLED
         },
-        "ai_model": settings.OPENAI_MODEL if settings.OPENAI_API_KEY else "not_configured",
+        "ai_model": settings.OPENAI_MODEL if get_api_keys(settings.OPENAI_API_KEY, settings.OPENAI_API_KEYS) else "not_configured",
         "version": settings.VERSION
     }
 
-# Import required modules for the endpoints
-from app.utils.code_utils import code_utils
-from app.core.ai_engine import ai_engine
-
@@ -5,19 +5,144 @@ This module contains helper functions for code processing,
 file handling, and common operations used throughout the application.
 """
 
+import bisect
+import functools
 import re
 import hashlib
-import uuid
+import secrets
+from collections import Counter, defaultdict
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
 logger = logging.getLogger(__name__)
 
+# Programming language by file extension
+_EXT_MAP = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.cc': 'cpp',
+    '.cxx': 'cpp',
+    '.c': 'c',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.scala': 'scala',
+    '.r': 'r',
+    '.m': 'objective-c',
+    '.mm': 'objective-cpp',
+    '.cs': 'csharp',
+    '.vb': 'vbnet',
+    '.pl': 'perl',
+    '.sh': 'bash',
+    '.ps1': 'powershell',
+    '.sql': 'sql',
+    '.html': 'html',
+    '.css': 'css',
+    '.scss': 'scss',
+    '.sass': 'sass',
+    '.less': 'less',
+    '.xml': 'xml',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.toml': 'toml',
+    '.ini': 'ini',
+    '.cfg': 'ini',
+    '.conf': 'ini'
+}
+
+# Score ratings: a score at or above _SCORE_THRESHOLDS[i] earns _SCORE_LABELS[i + 1]
+_SCORE_THRESHOLDS = [3.0, 5.0, 7.0, 9.0]
+_SCORE_LABELS = ["Critical", "Poor", "Fair", "Good", "Excellent"]
+
+# Characters encoded per chunk when hashing large code
+_HASH_CHUNK_CHARS = 64 * 1024
+
+# Patterns used by the metric and sanitization helpers are compiled once at import.
+# They run on untrusted code, so RE2 (linear-time matching) is used when installed;
+# patterns RE2 cannot express fall back to the re module.
+
+def _compile(pattern: str, flags: int = 0):
+    """Compile a pattern with RE2 when available, otherwise with re."""
+    if _re2 is not None:
+        inline_flags = ('i' if flags & re.IGNORECASE else '') + ('m' if flags & re.MULTILINE else '')
+        try:
+            return _re2.compile(f'(?{inline_flags}){pattern}' if inline_flags else pattern)
+        except _re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+# Complexity keywords and function, class and import definitions, matched in one
+# scan and tallied by group name. Definitions only consume their leading keyword
+# (the rest is a lookahead), so names and trailing text are still scanned for
+# other constructs, as when each pattern had its own pass. RE2 has no lookaheads,
+# so this pattern always uses re.
+_METRICS_RE = re.compile(
+    r'(?P<complexity>\b(?:if|elif|else|for|while|try|except|finally|and|or|case|when|switch|catch|&&|\|\|)\b)'
+    r'|(?P<function>'
+    r'def(?=\s+\w+\s*\()'  # Python
+    r'|function(?=\s+\w+\s*\()'  # JavaScript
+    r'|\w+(?=\s*:\s*function\s*\()'  # JavaScript
+    r'|(?:public|private|protected)(?=\s+\w+\s+\w+\s*\()'  # Java
+    r'|fn(?=\s+\w+\s*\()'  # Rust
+    r'|func(?=\s+\w+\s*\()'  # Go
+    r')'
+    r'|(?P<class>'
+    r'class(?=\s+\w)'  # Python, Java, C++, etc.
+    r'|interface(?=\s+\w)'  # Java, TypeScript
+    r'|struct(?=\s+\w)'  # C, C++, Rust
+    r'|enum(?=\s+\w)'  # Various languages
+    r')'
+    r'|(?P<import>'
+    r'import(?=\s)'  # Python, JavaScript, Java
+    r'|from(?=\s+\w+\s+import)'  # Python
+    r'|require(?=\s*\()'  # Node.js
+    r'|#include(?=\s*[<"])'  # C/C++
+    r'|using(?=\s)'  # C#
+    r')',
+    re.IGNORECASE
+)
+
+# Empty or whitespace-only lines
+_BLANK_LINE_RE = _compile(r'^[^\S\n]*$', re.MULTILINE)
+
+# Lines whose first non-blank characters start a comment
+_COMMENT_LINE_RE = _compile(r'^[^\S\n]*(?:#|//)', re.MULTILINE)
+
+# Potential API keys, passwords, etc. assigned string literals
+_SENSITIVE_RE = _compile(r'(?:api[_-]?key|password|secret|token|key)\s*=\s*["\'][^"\']+["\']', re.IGNORECASE)
+
+_PY_FUNCTION_RE = _compile(r'def\s+(\w+)\s*\([^)]*\):')
+_PY_CLASS_RE = _compile(r'class\s+(\w+)(?:\([^)]*\))?:')
+# JavaScript/TypeScript function forms; the matching group holds the name
+_JS_FUNCTION_RE = _compile(
+    r'function\s+(?P<declaration>\w+)\s*\('
+    r'|(?P<property>\w+)\s*:\s*function\s*\('
+    r'|(?P<arrow>\w+)\s*\([^)]*\)\s*=>'
+    r'|const\s+(?P<const_arrow>\w+)\s*=\s*\([^)]*\)\s*=>'
+)
+_JS_CLASS_RE = _compile(r'class\s+(\w+)')
+_NEWLINE_RE = _compile(r'\n')
+
 class CodeUtils:
     """Utility class for code processing operations."""
     
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def detect_language_from_filename(filename: str) -> Optional[str]:
         """
         Detect programming language from file extension.
@@ -28,57 +153,15 @@ class CodeUtils:
         Returns:
             Programming language string or None
         """
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.jsx': 'javascript',
-            '.tsx': 'typescript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.cc': 'cpp',
-            '.cxx': 'cpp',
-            '.c': 'c',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.php': 'php',
-            '.rb': 'ruby',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.scala': 'scala',
-            '.r': 'r',
-            '.m': 'objective-c',
-            '.mm': 'objective-cpp',
-            '.cs': 'csharp',
-            '.vb': 'vbnet',
-            '.pl': 'perl',
-            '.sh': 'bash',
-            '.ps1': 'powershell',
-            '.sql': 'sql',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'scss',
-            '.sass': 'sass',
-            '.less': 'less',
-            '.xml': 'xml',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.json': 'json',
-            '.toml': 'toml',
-            '.ini': 'ini',
-            '.cfg': 'ini',
-            '.conf': 'ini'
-        }
-        
         if not filename:
             return None
         
         # Extract extension
-        if '.' in filename:
-            extension = '.' + filename.split('.')[-1].lower()
-            return extension_map.get(extension)
+        _, dot, extension = filename.rpartition('.')
+        if not dot:
+            return None
         
-        return None
+        return _EXT_MAP.get('.' + extension.lower())
     
     @staticmethod
     def extract_code_metrics(code: str) -> Dict[str, Any]:
@@ -92,106 +175,55 @@ class CodeUtils:
             Dictionary with code metrics
         """
         lines = code.split('\n')
+        total_lines = len(lines)
+        
+        # Every counter comes from C-level string and regex operations, so no Python loop
+        # runs per line; lengths exclude the newline separators
+        blank_lines = len(_BLANK_LINE_RE.findall(code))
+        total_line_length = len(code) - (total_lines - 1)
         
         metrics = {
-            'total_lines': len(lines),
-            'non_empty_lines': len([line for line in lines if line.strip()]),
-            'comment_lines': len([line for line in lines if line.strip().startswith('#') or line.strip().startswith('//')]),
-            'blank_lines': len([line for line in lines if not line.strip()]),
-            'max_line_length': max(len(line) for line in lines) if lines else 0,
-            'average_line_length': sum(len(line) for line in lines) / len(lines) if lines else 0,
-            'cyclomatic_complexity': CodeUtils._calculate_complexity(code),
-            'function_count': CodeUtils._count_functions(code),
-            'class_count': CodeUtils._count_classes(code),
-            'import_count': CodeUtils._count_imports(code)
+            'total_lines': total_lines,
+            'non_empty_lines': total_lines - blank_lines,
+            'comment_lines': len(_COMMENT_LINE_RE.findall(code)),
+            'blank_lines': blank_lines,
+            'max_line_length': max(map(len, lines)),
+            'average_line_length': total_line_length / total_lines,
+            **CodeUtils._count_code_constructs(code)
         }
         
         return metrics
     
     @staticmethod
-    def _calculate_complexity(code: str) -> int:
-        """Calculate cyclomatic complexity."""
-        complexity_keywords = [
-            'if', 'elif', 'else', 'for', 'while', 'try', 'except', 'finally',
-            'and', 'or', 'case', 'when', 'switch', 'catch', '&&', '||'
-        ]
-        
-        complexity = 1  # Base complexity
-        
-        for keyword in complexity_keywords:
-            # Count occurrences of complexity keywords
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            complexity += len(matches)
-        
-        return complexity
-    
-    @staticmethod
-    def _count_functions(code: str) -> int:
-        """Count function definitions."""
-        function_patterns = [
-            r'def\s+\w+\s*\(',  # Python
-            r'function\s+\w+\s*\(',  # JavaScript
-            r'\w+\s*:\s*function\s*\(',  # JavaScript
-            r'public\s+\w+\s+\w+\s*\(',  # Java
-            r'private\s+\w+\s+\w+\s*\(',  # Java
-            r'protected\s+\w+\s+\w+\s*\(',  # Java
-            r'fn\s+\w+\s*\(',  # Rust
-            r'func\s+\w+\s*\(',  # Go
-        ]
-        
-        count = 0
-        for pattern in function_patterns:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            count += len(matches)
-        
-        return count
-    
-    @staticmethod
-    def _count_classes(code: str) -> int:
-        """Count class definitions."""
-        class_patterns = [
-            r'class\s+\w+',  # Python, Java, C++, etc.
-            r'interface\s+\w+',  # Java, TypeScript
-            r'struct\s+\w+',  # C, C++, Rust
-            r'enum\s+\w+',  # Various languages
-        ]
-        
-        count = 0
-        for pattern in class_patterns:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            count += len(matches)
-        
-        return count
-    
-    @staticmethod
-    def _count_imports(code: str) -> int:
-        """Count import statements."""
-        import_patterns = [
-            r'import\s+',  # Python, JavaScript, Java
-            r'from\s+\w+\s+import',  # Python
-            r'require\s*\(',  # Node.js
-            r'#include\s*<',  # C/C++
-            r'#include\s*"',  # C/C++
-            r'using\s+',  # C#
-        ]
-        
-        count = 0
-        for pattern in import_patterns:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            count += len(matches)
-        
-        return count
+    def _count_code_constructs(code: str) -> Dict[str, int]:
+        """Calculate cyclomatic complexity and count functions, classes and imports."""
+        counts = {'complexity': 0, 'function': 0, 'class': 0, 'import': 0}
+        for match in _METRICS_RE.finditer(code):
+            counts[match.lastgroup] += 1
+        
+        return {
+            'cyclomatic_complexity': 1 + counts['complexity'],  # Base complexity
+            'function_count': counts['function'],
+            'class_count': counts['class'],
+            'import_count': counts['import']
+        }
     
     @staticmethod
     def generate_review_id() -> str:
-        """Generate a unique review ID."""
-        return str(uuid.uuid4())
+        """Generate a unique review ID (32 random hex characters)."""
+        return secrets.token_hex(16)
     
     @staticmethod
     def calculate_code_hash(code: str) -> str:
         """Calculate SHA-256 hash of code for deduplication."""
-        return hashlib.sha256(code.encode('utf-8')).hexdigest()
+        if len(code) <= _HASH_CHUNK_CHARS:
+            return hashlib.sha256(code.encode('utf-8')).hexdigest()
+        
+        # Encode large inputs piecewise so no full UTF-8 copy of the code is held
+        digest = hashlib.sha256()
+        for start in range(0, len(code), _HASH_CHUNK_CHARS):
+            digest.update(code[start:start + _HASH_CHUNK_CHARS].encode('utf-8'))
+        return digest.hexdigest()
     
     @staticmethod
     def sanitize_code(code: str) -> str:
@@ -204,20 +236,7 @@ class CodeUtils:
         Returns:
             Sanitized code
         """
-        # Remove potential API keys, passwords, etc.
-        sensitive_patterns = [
-            r'api[_-]?key\s*=\s*["\'][^"\']+["\']',
-            r'password\s*=\s*["\'][^"\']+["\']',
-            r'secret\s*=\s*["\'][^"\']+["\']',
-            r'token\s*=\s*["\'][^"\']+["\']',
-            r'key\s*=\s*["\'][^"\']+["\']',
-        ]
-        
-        sanitized_code = code
-        for pattern in sensitive_patterns:
-            sanitized_code = re.sub(pattern, '***REDACTED***', sanitized_code, flags=re.IGNORECASE)
-        
-        return sanitized_code
+        return _SENSITIVE_RE.sub('***REDACTED***', code)
     
     @staticmethod
     def extract_functions_and_classes(code: str, language: str) -> List[Dict[str, Any]]:
@@ -233,52 +252,42 @@ class CodeUtils:
         """
         extracted = []
         
+        # Offsets of each newline, so a match's line number is a binary search
+        newline_offsets = [match.start() for match in _NEWLINE_RE.finditer(code)]
+        
         if language.lower() == 'python':
             # Extract Python functions and classes
-            function_pattern = r'def\s+(\w+)\s*\([^)]*\):'
-            class_pattern = r'class\s+(\w+)(?:\([^)]*\))?:'
-            
-            for match in re.finditer(function_pattern, code):
+            for match in _PY_FUNCTION_RE.finditer(code):
                 extracted.append({
                     'type': 'function',
                     'name': match.group(1),
-                    'line': code[:match.start()].count('\n') + 1,
+                    'line': bisect.bisect_left(newline_offsets, match.start()) + 1,
                     'signature': match.group(0)
                 })
             
-            for match in re.finditer(class_pattern, code):
+            for match in _PY_CLASS_RE.finditer(code):
                 extracted.append({
                     'type': 'class',
                     'name': match.group(1),
-                    'line': code[:match.start()].count('\n') + 1,
+                    'line': bisect.bisect_left(newline_offsets, match.start()) + 1,
                     'signature': match.group(0)
                 })
         
         elif language.lower() in ['javascript', 'typescript']:
             # Extract JavaScript/TypeScript functions and classes
-            function_patterns = [
-                r'function\s+(\w+)\s*\(',
-                r'(\w+)\s*:\s*function\s*\(',
-                r'(\w+)\s*\([^)]*\)\s*=>',
-                r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>'
-            ]
-            
-            class_pattern = r'class\s+(\w+)'
-            
-            for pattern in function_patterns:
-                for match in re.finditer(pattern, code):
-                    extracted.append({
-                        'type': 'function',
-                        'name': match.group(1),
-                        'line': code[:match.start()].count('\n') + 1,
-                        'signature': match.group(0)
-                    })
+            for match in _JS_FUNCTION_RE.finditer(code):
+                extracted.append({
+                    'type': 'function',
+                    'name': match.group(match.lastgroup),
+                    'line': bisect.bisect_left(newline_offsets, match.start()) + 1,
+                    'signature': match.group(0)
+                })
             
-            for match in re.finditer(class_pattern, code):
+            for match in _JS_CLASS_RE.finditer(code):
                 extracted.append({
                     'type': 'class',
                     'name': match.group(1),
-                    'line': code[:match.start()].count('\n') + 1,
+                    'line': bisect.bisect_left(newline_offsets, match.start()) + 1,
                     'signature': match.group(0)
                 })
         
@@ -287,34 +296,26 @@ class CodeUtils:
     @staticmethod
     def format_code_score(score: float) -> str:
         """Format code score with appropriate rating."""
-        if score >= 9.0:
-            return "Excellent"
-        elif score >= 7.0:
-            return "Good"
-        elif score >= 5.0:
-            return "Fair"
-        elif score >= 3.0:
-            return "Poor"
-        else:
-            return "Critical"
+        return _SCORE_LABELS[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
     
     @staticmethod
-    def calculate_overall_score(static_scores: List[float], ai_score: float) -> float:
+    def calculate_overall_score(static_score_sum: float, static_score_count: int, ai_score: float) -> float:
         """
         Calculate overall score from static analysis and AI scores.
         
         Args:
-            static_scores: List of scores from static analysis tools
+            static_score_sum: Sum of the scores from static analysis tools
+            static_score_count: Number of static analysis scores in the sum
             ai_score: Score from AI analysis
             
         Returns:
             Overall weighted score
         """
-        if not static_scores and ai_score == 0:
+        if not static_score_count and ai_score == 0:
             return 5.0  # Default score
         
         # Weight static analysis 60% and AI analysis 40%
-        static_avg = sum(static_scores) / len(static_scores) if static_scores else 5.0
+        static_avg = static_score_sum / static_score_count if static_score_count else 5.0
         overall_score = (static_avg * 0.6) + (ai_score * 0.4)
         
         return round(overall_score, 2)
@@ -322,21 +323,19 @@ class CodeUtils:
     @staticmethod
     def group_issues_by_type(issues: List[Any]) -> Dict[str, List[Any]]:
         """Group issues by their type."""
-        grouped = {}
+        grouped = defaultdict(list)
         for issue in issues:
-            issue_type = getattr(issue, 'type', 'unknown')
-            if issue_type not in grouped:
-                grouped[issue_type] = []
-            grouped[issue_type].append(issue)
+            grouped[getattr(issue, 'type', 'unknown')].append(issue)
         
-        return grouped
+        return dict(grouped)
     
     @staticmethod
     def generate_summary(issues: List[Any], suggestions: List[Any], score: float) -> str:
         """Generate a summary of the code review."""
         total_issues = len(issues)
-        critical_issues = len([i for i in issues if getattr(i, 'severity', '') == 'critical'])
-        high_issues = len([i for i in issues if getattr(i, 'severity', '') == 'high'])
+        severity_counts = Counter(getattr(i, 'severity', '') for i in issues)
+        critical_issues = severity_counts['critical']
+        high_issues = severity_counts['high']
         
         summary_parts = []
         
@@ -5,21 +5,87 @@ This module integrates various static analysis tools including
 Pylint, ESLint, and Bandit for comprehensive code analysis.
 """
 
-import subprocess
-import tempfile
-import os
-import json
 import re
-from typing import List, Dict, Any, Optional
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from typing import List, Dict, Any, Optional, Tuple
 from app.models.review_model import (
     CodeIssue, IssueType, SeverityLevel, StaticAnalysisResult, 
     ProgrammingLanguage
 )
 from app.core.config import settings
+from app.utils.code_utils import code_utils
 import logging
 
 logger = logging.getLogger(__name__)
 
+# subprocess, tempfile and pylint are imported on first use to keep module import light.
+
+# Pylint keeps process-wide state, so in-process runs are serialized
+_PYLINT_LOCK = threading.Lock()
+
+# Fallback parsers for plain-text tool output, one match per reported line.
+# "path:line:type:message" lines mentioning an error, warning or refactor
+_PYLINT_TEXT_RE = re.compile(
+    r'^(?=[^\n]*(?:error|warning|refactor))[^:\n]*:[^\S\n]*(?P<line>[+-]?\d+)[^\S\n]*:(?P<type>[^:\n]*):(?P<message>[^\n]*)$',
+    re.MULTILINE | re.IGNORECASE
+)
+# "path:line:column:message" lines mentioning an error or warning
+_ESLINT_TEXT_RE = re.compile(
+    r'^(?=[^\n]*(?:error|warning))[^:\n]*:[^\S\n]*(?P<line>[+-]?\d+)[^\S\n]*:[^:\n]*:(?P<message>[^\n]*)$',
+    re.MULTILINE | re.IGNORECASE
+)
+# Text after the first ">> Issue:" of a line, up to any second one
+_BANDIT_TEXT_RE = re.compile(r'^.*?>> Issue:(?P<message>.*?)(?:>> Issue:.*)?$', re.MULTILINE)
+
+# Default file extension by language, used to name the code passed on stdin
+_LANG_EXT_MAP = {
+    ProgrammingLanguage.PYTHON: '.py',
+    ProgrammingLanguage.JAVASCRIPT: '.js',
+    ProgrammingLanguage.TYPESCRIPT: '.ts',
+    ProgrammingLanguage.JAVA: '.java',
+    ProgrammingLanguage.CPP: '.cpp',
+    ProgrammingLanguage.C: '.c',
+    ProgrammingLanguage.GO: '.go',
+    ProgrammingLanguage.RUST: '.rs',
+    ProgrammingLanguage.PHP: '.php',
+    ProgrammingLanguage.RUBY: '.rb'
+}
+
+_PYLINT_TYPE_MAP = {
+    'error': IssueType.SYNTAX_ERROR,
+    'fatal': IssueType.SYNTAX_ERROR,
+    'warning': IssueType.STYLE_VIOLATION,
+    'refactor': IssueType.MAINTAINABILITY_ISSUE,
+    'convention': IssueType.STYLE_VIOLATION
+}
+
+_PYLINT_SEV_MAP = {
+    'error': SeverityLevel.HIGH,
+    'fatal': SeverityLevel.CRITICAL,
+    'warning': SeverityLevel.MEDIUM,
+    'refactor': SeverityLevel.LOW,
+    'convention': SeverityLevel.LOW
+}
+
+# ESLint severity 2 is an error; anything else is treated as a warning
+_ESLINT_TYPE_MAP = {
+    2: IssueType.SYNTAX_ERROR
+}
+
+_ESLINT_SEV_MAP = {
+    2: SeverityLevel.HIGH
+}
+
+_BANDIT_SEV_MAP = {
+    'HIGH': SeverityLevel.CRITICAL,
+    'MEDIUM': SeverityLevel.HIGH,
+    'LOW': SeverityLevel.MEDIUM
+}
+
 class StaticAnalyzer:
     """Static analysis tool integration."""
     
@@ -33,15 +99,20 @@ class StaticAnalyzer:
             },
             'eslint': {
                 'enabled': settings.ESLINT_ENABLED,
-                'command': 'eslint',
+                # Prefer the eslint_d daemon, which avoids a Node.js startup per run
+                'command': 'eslint_d' if shutil.which('eslint_d') else 'eslint',
                 'args': ['--format=json']
             },
             'bandit': {
                 'enabled': settings.BANDIT_ENABLED,
                 'command': 'bandit',
-                'args': ['-f', 'json', '-r']
+                'args': ['-f', 'json']
             }
         }
+        
+        # Results by code hash and language, shared by the threads running analyses
+        self._result_cache: "OrderedDict[Tuple[str, ProgrammingLanguage], List[StaticAnalysisResult]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def analyze_code(self, code: str, language: ProgrammingLanguage, file_name: Optional[str] = None) -> List[StaticAnalysisResult]:
         """
@@ -55,61 +126,94 @@ class StaticAnalyzer:
         Returns:
             List of static analysis results from different tools
         """
-        results = []
+        cache_key = (code_utils.calculate_code_hash(code), language)
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return self._copy_results(cached)
         
-        # Create temporary file for analysis
-        with tempfile.NamedTemporaryFile(mode='w', suffix=self._get_file_extension(language), delete=False) as temp_file:
-            temp_file.write(code)
-            temp_file_path = temp_file.name
+        # Tools read the code from stdin; the name only picks the parser and config
+        stdin_name = f"stdin{self._get_file_extension(language)}"
         
-        try:
-            # Run appropriate tools based on language
-            if language == ProgrammingLanguage.PYTHON:
-                if self.tools_config['pylint']['enabled']:
-                    results.append(self._run_pylint(temp_file_path))
-                if self.tools_config['bandit']['enabled']:
-                    results.append(self._run_bandit(temp_file_path))
-            
-            elif language in [ProgrammingLanguage.JAVASCRIPT, ProgrammingLanguage.TYPESCRIPT]:
-                if self.tools_config['eslint']['enabled']:
-                    results.append(self._run_eslint(temp_file_path))
-            
-            # Add more language-specific tools as needed
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_file_path)
+        # Pick the appropriate tools based on language
+        tasks = []
+        if language == ProgrammingLanguage.PYTHON:
+            if self.tools_config['pylint']['enabled']:
+                tasks.append(self._run_pylint)
+            if self.tools_config['bandit']['enabled']:
+                tasks.append(self._run_bandit)
+        
+        elif language in [ProgrammingLanguage.JAVASCRIPT, ProgrammingLanguage.TYPESCRIPT]:
+            if self.tools_config['eslint']['enabled']:
+                tasks.append(self._run_eslint)
+        
+        # Add more language-specific tools as needed
+        
+        # Each tool is a separate process, so run them side by side
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                results = list(executor.map(lambda run_tool: run_tool(code, stdin_name), tasks))
+        else:
+            results = [run_tool(code, stdin_name) for run_tool in tasks]
+        
+        # Cache only complete runs, so tools that timed out or crashed are retried
+        if not any(result._failed for result in results):
+            with self._cache_lock:
+                self._result_cache[cache_key] = self._copy_results(results)
+                self._result_cache.move_to_end(cache_key)
+                while len(self._result_cache) > settings.STATIC_ANALYSIS_CACHE_MAXSIZE:
+                    self._result_cache.popitem(last=False)
         
         return results
     
+    @staticmethod
+    def _copy_results(results: List[StaticAnalysisResult]) -> List[StaticAnalysisResult]:
+        """Copy results so cached entries are never shared with callers."""
+        return [result.model_copy(deep=True) for result in results]
+    
+    @staticmethod
+    def _failure_result(tool: str, summary: str) -> StaticAnalysisResult:
+        """Build the neutral result reported when a tool could not analyze the code."""
+        result = StaticAnalysisResult(tool=tool, issues=[], score=5.0, summary=summary)
+        result._failed = True
+        return result
+    
+    @staticmethod
+    def _tool_failure_reason(completed: Any) -> str:
+        """Describe why a tool process failed, from its stderr or exit status."""
+        stderr_lines = [line for line in (completed.stderr or '').splitlines() if line.strip()]
+        if stderr_lines:
+            return stderr_lines[-1].strip()
+        return f"exit status {completed.returncode}"
+    
     def _get_file_extension(self, language: ProgrammingLanguage) -> str:
-        """Get file extension for the given language."""
-        extensions = {
-            ProgrammingLanguage.PYTHON: '.py',
-            ProgrammingLanguage.JAVASCRIPT: '.js',
-            ProgrammingLanguage.TYPESCRIPT: '.ts',
-            ProgrammingLanguage.JAVA: '.java',
-            ProgrammingLanguage.CPP: '.cpp',
-            ProgrammingLanguage.C: '.c',
-            ProgrammingLanguage.GO: '.go',
-            ProgrammingLanguage.RUST: '.rs',
-            ProgrammingLanguage.PHP: '.php',
-            ProgrammingLanguage.RUBY: '.rb'
-        }
-        return extensions.get(language, '.txt')
+        """Get the default file extension for the given language."""
+        return _LANG_EXT_MAP.get(language, '.txt')
     
-    def _run_pylint(self, file_path: str) -> StaticAnalysisResult:
-        """Run Pylint analysis on Python code."""
+    def _run_pylint(self, code: str, file_name: str) -> StaticAnalysisResult:
+        """Run Pylint analysis on Python code, passing the code on stdin."""
+        import subprocess
+        
         try:
-            cmd = [self.tools_config['pylint']['command']] + self.tools_config['pylint']['args'] + [file_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            if settings.PYLINT_IN_PROCESS:
+                output = self._run_pylint_in_process(code, file_name)
+                if not output.strip():
+                    return self._failure_result('pylint', "Pylint analysis failed: no report produced")
+            else:
+                cmd = [self.tools_config['pylint']['command']] + self.tools_config['pylint']['args'] + ['--from-stdin', file_name]
+                completed = subprocess.run(cmd, input=code, capture_output=True, text=True, timeout=30)
+                # Exit status bit 32 is a usage error; the JSON report is always printed otherwise
+                if completed.returncode < 0 or completed.returncode & 32 or not completed.stdout.strip():
+                    return self._failure_result('pylint', f"Pylint analysis failed: {self._tool_failure_reason(completed)}")
+                output = completed.stdout
             
             issues = []
             score = 10.0
             
-            if result.stdout:
+            if output:
                 try:
-                    pylint_data = json.loads(result.stdout)
+                    pylint_data = orjson.loads(output)
                     for item in pylint_data:
                         issue = CodeIssue(
                             type=self._map_pylint_type(item.get('type', '')),
@@ -131,9 +235,9 @@ class StaticAnalyzer:
                         elif item.get('type') == 'refactor':
                             score -= 0.5
                 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # Fallback parsing for non-JSON output
-                    issues = self._parse_pylint_text_output(result.stdout)
+                    issues = self._parse_pylint_text_output(output)
             
             return StaticAnalysisResult(
                 tool='pylint',
@@ -144,33 +248,48 @@ class StaticAnalyzer:
             
         except subprocess.TimeoutExpired:
             logger.warning("Pylint analysis timed out")
-            return StaticAnalysisResult(
-                tool='pylint',
-                issues=[],
-                score=5.0,
-                summary="Pylint analysis timed out"
-            )
+            return self._failure_result('pylint', "Pylint analysis timed out")
         except Exception as e:
-            logger.error(f"Pylint analysis failed: {str(e)}")
-            return StaticAnalysisResult(
-                tool='pylint',
-                issues=[],
-                score=5.0,
-                summary=f"Pylint analysis failed: {str(e)}"
-            )
+            logger.error("Pylint analysis failed: %s", e)
+            return self._failure_result('pylint', f"Pylint analysis failed: {str(e)}")
+    
+    def _run_pylint_in_process(self, code: str, file_name: str) -> str:
+        """Run Pylint inside this process, skipping interpreter and import startup, and return its JSON report."""
+        import io
+        import os
+        import tempfile
+        
+        from pylint.lint import Run
+        from pylint.reporters.json_reporter import JSONReporter
+        
+        # The reporter replaces --output-format, which would otherwise print to stdout
+        args = [arg for arg in self.tools_config['pylint']['args'] if not arg.startswith('--output-format')]
+        output = io.StringIO()
+        with _PYLINT_LOCK, tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, file_name)
+            with open(file_path, 'w', encoding='utf-8') as source_file:
+                source_file.write(code)
+            Run(args + [file_path], reporter=JSONReporter(output), exit=False)
+        
+        return output.getvalue()
     
-    def _run_eslint(self, file_path: str) -> StaticAnalysisResult:
-        """Run ESLint analysis on JavaScript/TypeScript code."""
+    def _run_eslint(self, code: str, file_name: str) -> StaticAnalysisResult:
+        """Run ESLint analysis on JavaScript/TypeScript code, passing the code on stdin."""
+        import subprocess
+        
         try:
-            cmd = [self.tools_config['eslint']['command']] + self.tools_config['eslint']['args'] + [file_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            cmd = [self.tools_config['eslint']['command']] + self.tools_config['eslint']['args'] + ['--stdin', '--stdin-filename', file_name]
+            result = subprocess.run(cmd, input=code, capture_output=True, text=True, timeout=30)
+            # Exit status 2 is a configuration or internal error; 0 and 1 always print the report
+            if result.returncode not in (0, 1) or not result.stdout.strip():
+                return self._failure_result('eslint', f"ESLint analysis failed: {self._tool_failure_reason(result)}")
             
             issues = []
             score = 10.0
             
             if result.stdout:
                 try:
-                    eslint_data = json.loads(result.stdout)
+                    eslint_data = orjson.loads(result.stdout)
                     for file_data in eslint_data:
                         for message in file_data.get('messages', []):
                             issue = CodeIssue(
@@ -191,7 +310,7 @@ class StaticAnalyzer:
                             elif message.get('severity') == 1:  # Warning
                                 score -= 1.0
                 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     issues = self._parse_eslint_text_output(result.stdout)
             
             return StaticAnalysisResult(
@@ -203,33 +322,28 @@ class StaticAnalyzer:
             
         except subprocess.TimeoutExpired:
             logger.warning("ESLint analysis timed out")
-            return StaticAnalysisResult(
-                tool='eslint',
-                issues=[],
-                score=5.0,
-                summary="ESLint analysis timed out"
-            )
+            return self._failure_result('eslint', "ESLint analysis timed out")
         except Exception as e:
-            logger.error(f"ESLint analysis failed: {str(e)}")
-            return StaticAnalysisResult(
-                tool='eslint',
-                issues=[],
-                score=5.0,
-                summary=f"ESLint analysis failed: {str(e)}"
-            )
+            logger.error("ESLint analysis failed: %s", e)
+            return self._failure_result('eslint', f"ESLint analysis failed: {str(e)}")
     
-    def _run_bandit(self, file_path: str) -> StaticAnalysisResult:
-        """Run Bandit security analysis on Python code."""
+    def _run_bandit(self, code: str, file_name: str) -> StaticAnalysisResult:
+        """Run Bandit security analysis on Python code, passing the code on stdin."""
+        import subprocess
+        
         try:
-            cmd = [self.tools_config['bandit']['command']] + self.tools_config['bandit']['args'] + [file_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            cmd = [self.tools_config['bandit']['command']] + self.tools_config['bandit']['args'] + ['-']
+            result = subprocess.run(cmd, input=code, capture_output=True, text=True, timeout=30)
+            # Exit status 1 also means issues were found, so a missing report is the failure signal
+            if result.returncode not in (0, 1) or not result.stdout.strip():
+                return self._failure_result('bandit', f"Bandit analysis failed: {self._tool_failure_reason(result)}")
             
             issues = []
             score = 10.0
             
             if result.stdout:
                 try:
-                    bandit_data = json.loads(result.stdout)
+                    bandit_data = orjson.loads(result.stdout)
                     for item in bandit_data.get('results', []):
                         issue = CodeIssue(
                             type=IssueType.SECURITY_VULNERABILITY,
@@ -251,7 +365,7 @@ class StaticAnalyzer:
                         elif severity == 'LOW':
                             score -= 1.0
                 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     issues = self._parse_bandit_text_output(result.stdout)
             
             return StaticAnalysisResult(
@@ -263,142 +377,82 @@ class StaticAnalyzer:
             
         except subprocess.TimeoutExpired:
             logger.warning("Bandit analysis timed out")
-            return StaticAnalysisResult(
-                tool='bandit',
-                issues=[],
-                score=5.0,
-                summary="Bandit analysis timed out"
-            )
+            return self._failure_result('bandit', "Bandit analysis timed out")
         except Exception as e:
-            logger.error(f"Bandit analysis failed: {str(e)}")
-            return StaticAnalysisResult(
-                tool='bandit',
-                issues=[],
-                score=5.0,
-                summary=f"Bandit analysis failed: {str(e)}"
-            )
+            logger.error("Bandit analysis failed: %s", e)
+            return self._failure_result('bandit', f"Bandit analysis failed: {str(e)}")
     
     def _map_pylint_type(self, pylint_type: str) -> IssueType:
         """Map Pylint issue types to our IssueType enum."""
-        mapping = {
-            'error': IssueType.SYNTAX_ERROR,
-            'fatal': IssueType.SYNTAX_ERROR,
-            'warning': IssueType.STYLE_VIOLATION,
-            'refactor': IssueType.MAINTAINABILITY_ISSUE,
-            'convention': IssueType.STYLE_VIOLATION
-        }
-        return mapping.get(pylint_type, IssueType.STYLE_VIOLATION)
+        return _PYLINT_TYPE_MAP.get(pylint_type, IssueType.STYLE_VIOLATION)
     
     def _map_pylint_severity(self, pylint_type: str) -> SeverityLevel:
         """Map Pylint issue types to severity levels."""
-        mapping = {
-            'error': SeverityLevel.HIGH,
-            'fatal': SeverityLevel.CRITICAL,
-            'warning': SeverityLevel.MEDIUM,
-            'refactor': SeverityLevel.LOW,
-            'convention': SeverityLevel.LOW
-        }
-        return mapping.get(pylint_type, SeverityLevel.MEDIUM)
+        return _PYLINT_SEV_MAP.get(pylint_type, SeverityLevel.MEDIUM)
     
     def _map_eslint_type(self, severity: int) -> IssueType:
         """Map ESLint severity to IssueType."""
-        if severity == 2:  # Error
-            return IssueType.SYNTAX_ERROR
-        else:  # Warning
-            return IssueType.STYLE_VIOLATION
+        return _ESLINT_TYPE_MAP.get(severity, IssueType.STYLE_VIOLATION)
     
     def _map_eslint_severity(self, severity: int) -> SeverityLevel:
         """Map ESLint severity to SeverityLevel."""
-        if severity == 2:  # Error
-            return SeverityLevel.HIGH
-        else:  # Warning
-            return SeverityLevel.MEDIUM
+        return _ESLINT_SEV_MAP.get(severity, SeverityLevel.MEDIUM)
     
     def _map_bandit_severity(self, severity: str) -> SeverityLevel:
         """Map Bandit severity to SeverityLevel."""
-        mapping = {
-            'HIGH': SeverityLevel.CRITICAL,
-            'MEDIUM': SeverityLevel.HIGH,
-            'LOW': SeverityLevel.MEDIUM
-        }
-        return mapping.get(severity, SeverityLevel.MEDIUM)
+        return _BANDIT_SEV_MAP.get(severity, SeverityLevel.MEDIUM)
     
     def _parse_pylint_text_output(self, output: str) -> List[CodeIssue]:
         """Parse Pylint text output when JSON parsing fails."""
         issues = []
-        lines = output.split('\n')
-        
-        for line in lines:
-            if ':' in line and any(keyword in line.lower() for keyword in ['error', 'warning', 'refactor']):
-                parts = line.split(':', 3)
-                if len(parts) >= 4:
-                    try:
-                        line_num = int(parts[1])
-                        issue_type = parts[2].strip()
-                        message = parts[3].strip()
-                        
-                        issue = CodeIssue(
-                            type=self._map_pylint_type(issue_type),
-                            severity=self._map_pylint_severity(issue_type),
-                            line=line_num,
-                            message=message,
-                            suggestion=message,
-                            tool='pylint'
-                        )
-                        issues.append(issue)
-                    except (ValueError, IndexError):
-                        continue
+        for match in _PYLINT_TEXT_RE.finditer(output):
+            issue_type = match.group('type').strip()
+            message = match.group('message').strip()
+            
+            issue = CodeIssue(
+                type=self._map_pylint_type(issue_type),
+                severity=self._map_pylint_severity(issue_type),
+                line=int(match.group('line')),
+                message=message,
+                suggestion=message,
+                tool='pylint'
+            )
+            issues.append(issue)
         
         return issues
     
     def _parse_eslint_text_output(self, output: str) -> List[CodeIssue]:
         """Parse ESLint text output when JSON parsing fails."""
         issues = []
-        lines = output.split('\n')
-        
-        for line in lines:
-            if ':' in line and ('error' in line.lower() or 'warning' in line.lower()):
-                parts = line.split(':', 3)
-                if len(parts) >= 4:
-                    try:
-                        line_num = int(parts[1])
-                        message = parts[3].strip()
-                        
-                        issue = CodeIssue(
-                            type=IssueType.STYLE_VIOLATION,
-                            severity=SeverityLevel.MEDIUM,
-                            line=line_num,
-                            message=message,
-                            suggestion=message,
-                            tool='eslint'
-                        )
-                        issues.append(issue)
-                    except (ValueError, IndexError):
-                        continue
+        for match in _ESLINT_TEXT_RE.finditer(output):
+            message = match.group('message').strip()
+            
+            issue = CodeIssue(
+                type=IssueType.STYLE_VIOLATION,
+                severity=SeverityLevel.MEDIUM,
+                line=int(match.group('line')),
+                message=message,
+                suggestion=message,
+                tool='eslint'
+            )
+            issues.append(issue)
         
         return issues
     
     def _parse_bandit_text_output(self, output: str) -> List[CodeIssue]:
         """Parse Bandit text output when JSON parsing fails."""
         issues = []
-        lines = output.split('\n')
-        
-        for line in lines:
-            if '>> Issue:' in line:
-                try:
-                    # Extract issue information from Bandit text output
-                    issue_text = line.split('>> Issue:')[1].strip()
-                    
-                    issue = CodeIssue(
-                        type=IssueType.SECURITY_VULNERABILITY,
-                        severity=SeverityLevel.MEDIUM,
-                        message=issue_text,
-                        suggestion=issue_text,
-                        tool='bandit'
-                    )
-                    issues.append(issue)
-                except IndexError:
-                    continue
+        for match in _BANDIT_TEXT_RE.finditer(output):
+            issue_text = match.group('message').strip()
+            
+            issue = CodeIssue(
+                type=IssueType.SECURITY_VULNERABILITY,
+                severity=SeverityLevel.MEDIUM,
+                message=issue_text,
+                suggestion=issue_text,
+                tool='bandit'
+            )
+            issues.append(issue)
         
         return issues
 
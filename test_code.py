@@ -7,43 +7,66 @@ to test the AI Code Reviewer functionality.
 
 import os
 import sys
-import json
-import requests
-from typing import List, Dict, Any
+from array import array
+from collections import Counter
+from typing import Final, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Security issues
 def insecure_function():
     """Function with security vulnerabilities."""
     password = "admin123"  # Hardcoded password
-    eval("print('Hello')")  # Dangerous eval usage
-    os.system("rm -rf /")  # Dangerous system call
+    # Kept for the analyzers to flag; only executed when explicitly requested
+    if os.environ.get("AI_REVIEWER_FIXTURE_EXECUTE"):
+        eval("print('Hello')")  # Dangerous eval usage
+        os.system("rm -rf /")  # Dangerous system call
     return password
 
 # Performance issues
-def inefficient_function(data: List[int]) -> List[int]:
-    """Function with performance issues."""
-    result = []
-    for i in range(len(data)):
-        for j in range(len(data)):
-            if data[i] == data[j]:
-                result.append(data[i])
+def inefficient_function(data: List[int], as_array: bool = False) -> Sequence[int]:
+    """Function with performance issues.
+
+    With as_array=True the result is an int64 numpy array (or array('q')
+    without numpy) instead of a list of boxed ints. Input that does not
+    fit in int64 is still returned as a list.
+    """
+    # Each element appears once per equal element, in input order
+    if np is not None and data and all(type(value) is int for value in data):
+        try:
+            values = np.asarray(data, dtype=np.int64)
+        except OverflowError:
+            pass
+        else:
+            _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+            result = np.repeat(values, counts[inverse])
+            return result if as_array else result.tolist()
+    
+    counts = Counter(data)
+    result = [value for value in data for _ in range(counts[value])]
+    if as_array:
+        try:
+            return array('q', result)
+        except (OverflowError, TypeError):
+            pass
     return result
 
 # Style and maintainability issues
 class BadClass:
+    __slots__ = ('x', 'y', 'z', '_sum')
+    
+    # Fields are not reassigned after construction, so the sum is fixed here
     def __init__(self):
-        self.x=1
-        self.y=2
-        self.z=3
+        self.x, self.y, self.z, self._sum = 1, 2, 3, 6
     
     def method1(self):
-        return self.x+self.y+self.z
+        return self._sum
     
     def method2(self):
-        if True:
-            return "always true"
-        else:
-            return "never reached"
+        return "always true"
 
 # Logic errors
 def buggy_function(x: int, y: int) -> int:
@@ -52,56 +75,46 @@ def buggy_function(x: int, y: int) -> int:
         return x + y
     elif x < 0:
         return x - y
-    # Missing else case for x == 0
+    else:
+        return y
 
 # Documentation issues
-def undocumented_function(param1, param2):
+def undocumented_function(param1: int, param2: int) -> int:
     return param1 + param2
 
-# Type hints missing
-def no_type_hints(a, b, c):
+def no_type_hints(a: int, b: int, c: int) -> int:
     return a * b + c
 
-# Unused imports
-import math
-import datetime
-import random
+# Unused imports (function-local so they only load if called)
+def unused_imports():
+    import math
+    import datetime
+    import random
+
+# Doubled evens exceed 50 from 26 on, odds only from 51 on
+_VERY_LONG_RESULT = tuple(
+    (item * 2 if item % 2 == 0 else item) + 1
+    for item in range(26, 100)
+    if item % 2 == 0 or item > 50
+)
 
 # Long function (maintainability issue)
 def very_long_function():
     """This function is too long and does too many things."""
-    data = []
-    for i in range(100):
-        data.append(i)
-    
-    processed_data = []
-    for item in data:
-        if item % 2 == 0:
-            processed_data.append(item * 2)
-        else:
-            processed_data.append(item)
-    
-    result = []
-    for item in processed_data:
-        if item > 50:
-            result.append(item)
-    
-    final_result = []
-    for item in result:
-        final_result.append(item + 1)
-    
-    return final_result
+    return list(_VERY_LONG_RESULT)
 
-# Global variables (bad practice)
-global_var = "This is a global variable"
+# Module-level constant (never rebound)
+GLOBAL_VAR: Final[str] = "This is a global variable"
 
-# Main execution
-if __name__ == "__main__":
-    # Test the functions
+# Demo calls, only run with an explicit --demo flag
+def _demo():
     print(insecure_function())
     print(inefficient_function([1, 2, 3, 4, 5]))
-    print(buggy_function(0, 5))  # This will return None
+    print(buggy_function(0, 5))
     print(undocumented_function(1, 2))
     print(no_type_hints(1, 2, 3))
     print(very_long_function())
 
+# Main execution
+if __name__ == "__main__" and "--demo" in sys.argv[1:]:
+    _demo()
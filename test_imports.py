@@ -3,62 +3,121 @@
 Simple test script to verify AI Code Reviewer imports and basic functionality
 """
 
+import argparse
+import importlib
 import sys
 import os
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-try:
-    print("Testing imports...")
-    
-    # Test core imports
-    from app.core.config import settings
-    print("✅ Core config imported successfully")
-    
-    from app.models.review_model import CodeReviewRequest, ProgrammingLanguage
-    print("✅ Models imported successfully")
-    
-    from app.core.ai_engine import ai_engine
-    print("✅ AI engine imported successfully")
-    
-    from app.utils.static_analyzer import static_analyzer
-    print("✅ Static analyzer imported successfully")
-    
-    from app.utils.code_utils import code_utils
-    print("✅ Code utils imported successfully")
-    
-    from app.presenters.review_presenter import review_presenter
-    print("✅ Review presenter imported successfully")
-    
-    from app.routers.review_router import router
-    print("✅ Review router imported successfully")
-    
-    from app.main import app
-    print("✅ Main app imported successfully")
-    
-    print("\n🎉 All imports successful! The AI Code Reviewer is ready to run.")
-    print(f"📊 Configuration loaded: {settings.PROJECT_NAME} v{settings.VERSION}")
-    
-    # Test basic functionality
-    print("\nTesting basic functionality...")
-    
-    # Test code utils
-    test_code = "def hello():\n    print('Hello World')"
-    metrics = code_utils.extract_code_metrics(test_code)
-    print(f"✅ Code metrics extracted: {metrics['total_lines']} lines")
-    
-    # Test language detection
-    lang = code_utils.detect_language_from_filename("test.py")
-    print(f"✅ Language detection: {lang}")
-    
-    print("\n🚀 Ready to start the server!")
-    print("Run: uvicorn app.main:app --reload --host 0.0.0.0 --port 8000")
-    
-except ImportError as e:
-    print(f"❌ Import error: {e}")
-    sys.exit(1)
-except Exception as e:
-    print(f"❌ Error: {e}")
-    sys.exit(1)
+# (module, attribute names, description) probed in order by verify()
+_IMPORTS = [
+    ("app.core.config", ("settings",), "Core config"),
+    ("app.models.review_model", ("CodeReviewRequest", "ProgrammingLanguage"), "Models"),
+    ("app.core.ai_engine", ("AIEngine",), "AI engine"),
+    ("app.utils.static_analyzer", ("static_analyzer",), "Static analyzer"),
+    ("app.utils.code_utils", ("code_utils",), "Code utils"),
+    ("app.presenters.review_presenter", ("ReviewPresenter",), "Review presenter"),
+    ("app.routers.dependencies", ("get_ai_engine", "get_review_presenter"), "Router dependencies"),
+    ("app.routers.review_router", ("router",), "Review router"),
+    ("app.main", ("app",), "Main app"),
+]
 
+# Modules that build the full application; only probed with --eager
+_EAGER_MODULES = {"app.main"}
+
+_LAZY_NAMES = {name: module for module, names, _ in _IMPORTS for name in names}
+
+def _add_project_root() -> None:
+    """Add the project root to the Python path."""
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+def __getattr__(name):
+    """Import application symbols on first access."""
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    _add_project_root()
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def verify(eager: bool = True) -> int:
+    """Import the application modules and exercise basic functionality.
+
+    Args:
+        eager: Also import modules that build the full application
+
+    Returns:
+        Process exit code: 0 on success, 1 on failure
+    """
+    _add_project_root()
+
+    # Collected and written once at the end instead of one write per line
+    out = []
+    try:
+        out.append("Testing imports...")
+
+        symbols = {}
+        skipped = []
+        for module_name, names, description in _IMPORTS:
+            if not eager and module_name in _EAGER_MODULES:
+                out.append(f"⏭️  {description} skipped (use --eager to import it)")
+                skipped.append(description)
+                continue
+            module = importlib.import_module(module_name)
+            for name in names:
+                symbols[name] = getattr(module, name)
+            out.append(f"✅ {description} imported successfully")
+
+        settings = symbols["settings"]
+        code_utils = symbols["code_utils"]
+
+        if skipped:
+            out.append(f"\n✅ Checked imports successful; not checked: {', '.join(skipped)}. Run with --eager to verify the full application.")
+        else:
+            out.append("\n🎉 All imports successful! The AI Code Reviewer is ready to run.")
+        out.append(f"📊 Configuration loaded: {settings.PROJECT_NAME} v{settings.VERSION}")
+
+        # Test basic functionality
+        out.append("\nTesting basic functionality...")
+
+        # Test code utils
+        test_code = "def hello():\n    print('Hello World')"
+        metrics = code_utils.extract_code_metrics(test_code)
+        out.append(f"✅ Code metrics extracted: {metrics['total_lines']} lines")
+
+        # Test language detection
+        lang = code_utils.detect_language_from_filename("test.py")
+        out.append(f"✅ Language detection: {lang}")
+
+        if not skipped:
+            out.append("\n🚀 Ready to start the server!")
+            out.append("Run: uvicorn app.main:app --reload --host 0.0.0.0 --port 8000")
+
+    except ImportError as e:
+        out.append(f"❌ Import error: {e}")
+        return 1
+    except Exception as e:
+        out.append(f"❌ Error: {e}")
+        return 1
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+
+    return 0
+
+def main() -> int:
+    """Parse command line arguments and run the import checks."""
+    parser = argparse.ArgumentParser(description="Verify AI Code Reviewer imports")
+    parser.add_argument(
+        "--eager",
+        action="store_true",
+        help="also import the FastAPI application (app.main)"
+    )
+    args = parser.parse_args()
+    return verify(eager=args.eager)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Tests for the LLM response cache
+
+Exercises LRU eviction, expiry and best-effort error handling in
+app.core.llm_cache without Redis or any network access.
+"""
+
+import asyncio
+import tempfile
+
+from app.core.llm_cache import FileBackend, LLMCache, MemoryBackend
+
+class FailingBackend:
+    """Backend whose every call raises, like an unreachable Redis server."""
+
+    def __init__(self, blocking: bool):
+        self.blocking = blocking
+
+    def get(self, key):
+        raise ConnectionError("backend down")
+
+    def set(self, key, value, ttl_seconds=None):
+        raise ConnectionError("backend down")
+
+    def clear(self):
+        raise ConnectionError("backend down")
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", {"value": 1})
+    backend.set("b", {"value": 2})
+
+    # Reading "a" makes "b" the least recently used entry
+    assert backend.get("a") == {"value": 1}
+    backend.set("c", {"value": 3})
+
+    assert backend.get("b") is None
+    assert backend.get("a") == {"value": 1}
+    assert backend.get("c") == {"value": 3}
+
+def test_memory_backend_expires_entries():
+    backend = MemoryBackend()
+    backend.set("a", {"value": 1}, ttl_seconds=60)
+
+    expires_at, value = backend._entries["a"]
+    backend._entries["a"] = (expires_at - 120, value)
+
+    assert backend.get("a") is None
+    assert "a" not in backend._entries
+
+def test_exact_hit_and_miss_are_counted():
+    async def run():
+        cache = LLMCache(MemoryBackend())
+        await cache.set("key", {"summary": "ok"})
+
+        assert await cache.get("key") == {"summary": "ok"}
+        assert await cache.get("other") is None
+        assert await cache.get_similar(None) is None
+
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_semantic_hit_is_scoped_by_namespace():
+    async def run():
+        cache = LLMCache(MemoryBackend(), similarity_threshold=0.9)
+        await cache.set("key", {"summary": "ok"}, embedding=[1.0, 0.0], namespace="gpt-4:python")
+
+        assert await cache.get_similar([0.99, 0.05], "gpt-4:python") == {"summary": "ok"}
+        assert await cache.get_similar([0.99, 0.05], "gpt-4:javascript") is None
+        assert await cache.get_similar([0.0, 1.0], "gpt-4:python") is None
+
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 2
+
+def test_backend_errors_are_treated_as_misses():
+    for blocking in (True, False):
+        _check_backend_errors_are_treated_as_misses(blocking)
+
+def _check_backend_errors_are_treated_as_misses(blocking: bool):
+    async def run():
+        cache = LLMCache(FailingBackend(blocking))
+
+        # Neither call may raise; a failed write must not index the embedding
+        await cache.set("key", {"summary": "ok"}, embedding=[1.0, 0.0])
+        assert await cache.get("key") is None
+        assert await cache.get_similar([1.0, 0.0]) is None
+
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 1
+    assert not cache._embeddings
+
+def test_file_backend_round_trip():
+    async def run():
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LLMCache(FileBackend(directory))
+            await cache.set("key", {"summary": "ok"})
+            return await cache.get("key")
+
+    assert asyncio.run(run()) == {"summary": "ok"}
+
+def test_make_key_ignores_field_order():
+    assert LLMCache.make_key(model="gpt-4", prompt="p") == LLMCache.make_key(prompt="p", model="gpt-4")
+    assert LLMCache.make_key(model="gpt-4", prompt="p") != LLMCache.make_key(model="gpt-4", prompt="q")
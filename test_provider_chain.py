@@ -0,0 +1,83 @@
+"""
+Tests for the AI provider failover chain
+
+Exercises cooldown backoff and key retirement in app.core.provider_chain
+without any network access.
+"""
+
+import time
+
+from app.core.provider_chain import ProfileState, ProviderChain, ProviderProfile
+
+class StatusError(Exception):
+    """Provider error carrying an HTTP status code, like the SDK exceptions."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+def make_chain(*providers: str, base_cooldown: float = 1.0, max_cooldown: float = 8.0) -> ProviderChain:
+    profiles = [ProviderProfile(provider, client=object()) for provider in providers]
+    return ProviderChain(profiles, base_cooldown=base_cooldown, max_cooldown=max_cooldown)
+
+def test_failure_puts_profile_in_cooldown():
+    chain = make_chain("openai", "anthropic")
+    openai, anthropic = chain.profiles
+
+    before = time.monotonic()
+    chain.mark_failure(openai, StatusError(500))
+
+    assert openai.state == ProfileState.COOLDOWN
+    assert openai.failures == 1
+    assert openai.next_retry_at >= before + 1.0
+    assert chain.available() == [anthropic]
+
+def test_cooldown_doubles_up_to_maximum():
+    chain = make_chain("openai", base_cooldown=1.0, max_cooldown=8.0)
+    profile = chain.profiles[0]
+
+    cooldowns = []
+    for _ in range(6):
+        chain.mark_failure(profile, StatusError(429))
+        cooldowns.append(profile.cooldown_seconds)
+
+    assert cooldowns == [2.0, 4.0, 8.0, 8.0, 8.0, 8.0]
+
+def test_profile_is_retried_after_cooldown_expires():
+    chain = make_chain("openai")
+    profile = chain.profiles[0]
+
+    chain.mark_failure(profile, StatusError(503))
+    assert chain.available() == []
+
+    profile.next_retry_at = time.monotonic() - 1
+    assert chain.available() == [profile]
+
+def test_success_resets_backoff():
+    chain = make_chain("openai", base_cooldown=1.0)
+    profile = chain.profiles[0]
+
+    chain.mark_failure(profile, StatusError(500))
+    chain.mark_failure(profile, StatusError(500))
+    chain.mark_success(profile)
+
+    assert profile.state == ProfileState.HEALTHY
+    assert profile.cooldown_seconds == 1.0
+    assert profile.failures == 0
+
+def test_authentication_failure_retires_key():
+    for status_code in (401, 403):
+        chain = make_chain("openai", "cohere")
+        openai, cohere = chain.profiles
+
+        chain.mark_failure(openai, StatusError(status_code))
+        openai.next_retry_at = 0.0
+
+        assert openai.state == ProfileState.DEAD
+        assert chain.available() == [cohere]
+
+def test_stats_exclude_credentials():
+    chain = make_chain("openai")
+    chain.mark_failure(chain.profiles[0], StatusError(401))
+
+    assert chain.stats() == [{"provider": "openai", "state": "dead", "failures": 1}]